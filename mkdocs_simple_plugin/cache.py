@@ -0,0 +1,163 @@
+"""Cache module stores documentation extracted from source files."""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import List
+
+from mkdocs import utils
+
+
+def get_plugin_version() -> str:
+    """Returns the installed version of the plugin, if known."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        from importlib import metadata
+        return metadata.version("mkdocs-simple-plugin")
+    except Exception:  # pylint: disable=broad-except
+        return ""
+
+
+class ExtractionCache:
+    """Content addressed cache of the documentation extracted from files.
+
+    Entries are keyed by the hash of a source's name and content together with
+    a fingerprint of the extraction settings, so they stay valid when a fresh
+    checkout resets modification times. Each entry is a directory holding the
+    extracted files. When the cache grows beyond its maximum size, the least
+    recently used entries are removed.
+    """
+
+    index_name = "outputs.json"
+
+    def __init__(self, directory: str, fingerprint: str, max_size: int):
+        """Initialize the cache.
+
+        Args:
+            directory (str): Directory to store the cache in
+            fingerprint (str): Hash of the extraction settings
+            max_size (int): Maximum size of the cache in bytes
+
+        """
+        self.directory = directory
+        self.fingerprint = fingerprint + get_plugin_version()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, path: str, data: bytes = None) -> str:
+        """Returns the cache key for a source file.
+
+        Args:
+            path (str): The path of the source file
+            data (bytes): The content of the file, if already read
+
+        """
+        digest = hashlib.sha256()
+        digest.update(self.fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(b"\0")
+        if data is not None:
+            digest.update(data)
+            return digest.hexdigest()
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        """Returns the directory of a cache entry."""
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str, destination: str) -> List[str]:
+        """Copy the cached outputs of an entry to a destination directory.
+
+        Returns:
+            The paths of the files copied, or None if there is no entry.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(os.path.join(entry_path, self.index_name), "r",
+                      encoding="utf-8") as index_file:
+                names = json.load(index_file)
+            paths = []
+            for number, name in enumerate(names):
+                path = os.path.join(destination, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Replace the file, rather than writing through a link
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                shutil.copyfile(
+                    os.path.join(entry_path, str(number)), temp_path)
+                os.replace(temp_path, path)
+                paths.append(path)
+            # Mark the entry as recently used
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return paths
+
+    def put(self, key: str, destination: str, paths: List[str]) -> None:
+        """Store the outputs extracted into a destination directory."""
+        entry_path = self._entry_path(key)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            temp_path = tempfile.mkdtemp(
+                prefix=key, dir=os.path.dirname(entry_path))
+            names = []
+            for number, path in enumerate(paths):
+                shutil.copyfile(path, os.path.join(temp_path, str(number)))
+                names.append(os.path.relpath(path, destination))
+            with open(os.path.join(temp_path, self.index_name), "w",
+                      encoding="utf-8") as index_file:
+                json.dump(names, index_file)
+            if not os.path.exists(entry_path):
+                os.replace(temp_path, entry_path)
+        except OSError as error:
+            if os.path.isdir(entry_path):
+                # Another process stored the same entry first
+                return
+            utils.log.warning(
+                "mkdocs-simple-plugin: could not cache %s\n %s",
+                entry_path, str(error))
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                shutil.rmtree(temp_path, ignore_errors=True)
+
+    def prune(self) -> None:
+        """Remove the least recently used entries beyond the maximum size."""
+        entries = []
+        total_size = 0
+        for bucket in _list_directories(self.directory):
+            for entry_path in _list_directories(bucket):
+                try:
+                    size = sum(entry.stat().st_size
+                               for entry in os.scandir(entry_path))
+                    used = os.stat(entry_path).st_mtime
+                except OSError:
+                    continue
+                entries.append((used, size, entry_path))
+                total_size += size
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+        utils.log.debug(
+            "mkdocs-simple-plugin: extraction cache %d hits, %d misses",
+            self.hits, self.misses)
+
+
+def _list_directories(directory: str) -> List[str]:
+    """Returns the paths of the subdirectories of a directory."""
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.path for entry in entries
+                    if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
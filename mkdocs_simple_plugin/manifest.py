@@ -0,0 +1,267 @@
+"""Manifest module records the outputs built from each source file."""
+import errno
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from typing import Dict, IO, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from mkdocs import utils
+
+
+def get_fingerprint(settings: dict) -> str:
+    """Returns a hash of the settings that affect the build outputs."""
+    data = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def get_state_dir(*names: str) -> str:
+    """Returns a path in the per-user directory the plugin keeps state in.
+
+    The directory is in the user's cache directory, so state about a build
+    isn't kept in the directories being built.
+    """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or \
+            os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mkdocs-simple-plugin", *names)
+
+
+def make_private_directory(path: str) -> None:
+    """Create a directory only the current user can use, if it's missing.
+
+    Raises:
+        OSError: If the directory can't be created, or if it is a symlink or
+            owned by another user.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    stat_result = os.lstat(path)
+    if not stat.S_ISDIR(stat_result.st_mode) or (
+            hasattr(os, "getuid") and stat_result.st_uid != os.getuid()):
+        raise OSError(
+            errno.EPERM, "Not a directory owned by the current user", path)
+
+
+def lock_directory(path: str) -> IO:
+    """Lock a directory for the current process, unless another one has.
+
+    The lock is held on a file next to the directory until the file is
+    closed, so it is released when the process exits.
+
+    Returns:
+        The open lock file, or None if the directory is locked already.
+    """
+    # pylint: disable=consider-using-with
+    lock_file = open(path + ".lock", "wb")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class BuildManifest:
+    """Persistent record of the outputs built from each source file.
+
+    The manifest is saved in the state directory, keyed by the build
+    directory, so a dirty build in a new
+    process can skip the sources that haven't changed and still register the
+    outputs they produced before. Sources are considered unchanged if their
+    size, modification time and inode are the same, and the manifest is
+    discarded if it was written with different settings.
+
+    The manifest also records the files written to the build directory, so
+    the ones a later build doesn't write again can be removed.
+    """
+
+    version = 2
+
+    def __init__(self, directory: str, fingerprint: str):
+        """Initialize an empty manifest for a build directory.
+
+        Args:
+            directory (str): The build directory of the manifest
+            fingerprint (str): Hash of the settings used for the build
+
+        """
+        self.directory = directory
+        key = hashlib.sha256(
+            os.path.abspath(directory).encode("utf-8")).hexdigest()
+        self.path = get_state_dir("manifests", f"{key}.json")
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, dict] = {}
+        self.written: Dict[str, List[int]] = {}
+        self._previous: Dict[str, dict] = {}
+        self._previous_written: Dict[str, List[int]] = {}
+
+    def load(self) -> None:
+        """Load the entries saved by a previous build, if any."""
+        try:
+            make_private_directory(os.path.dirname(self.path))
+            with open(self.path, "r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or \
+                data.get("version") != self.version:
+            return
+        written = data.get("written")
+        if isinstance(written, dict):
+            self._previous_written = written
+        if data.get("config") != self.fingerprint:
+            return
+        files = data.get("files")
+        if isinstance(files, dict):
+            self._previous = files
+
+    def load_from(self, previous: "BuildManifest") -> None:
+        """Load the entries of an earlier build in this process.
+
+        This is the same as loading the saved manifest of that build, without
+        reading the file.
+        """
+        self._previous = previous.entries
+        self._previous_written = previous.written
+
+    def keep_previous(self) -> None:
+        """Keep all of the loaded entries and written files.
+
+        Only the sources that changed then need to be added or removed.
+        """
+        self.entries = dict(self._previous)
+        self.written = dict(self._previous_written)
+
+    @staticmethod
+    def _get_stat(stat_result: os.stat_result) -> dict:
+        """Returns the fields of a stat result used to detect changes."""
+        return {
+            "size": stat_result.st_size,
+            "mtime_ns": stat_result.st_mtime_ns,
+            "inode": stat_result.st_ino,
+        }
+
+    def get_outputs(
+            self,
+            source: str,
+            stat_result: os.stat_result) -> List[List[str]]:
+        """Get the previous outputs of a source, if it hasn't changed.
+
+        Args:
+            source (str): The source file path
+            stat_result (os.stat_result): The current stat of the source
+
+        Returns:
+            A list of (output_root, output_relpath) pairs, or None if the
+            source changed or any of its outputs are missing.
+        """
+        entry = self._previous.get(source)
+        if not entry:
+            return None
+        if any(entry.get(key) != value
+               for key, value in self._get_stat(stat_result).items()):
+            return None
+        outputs = entry.get("outputs", [])
+        for output_root, output_relpath in outputs:
+            if not os.path.exists(os.path.join(output_root, output_relpath)):
+                return None
+        return outputs
+
+    def add(
+            self,
+            source: str,
+            stat_result: os.stat_result,
+            outputs: List[List[str]]) -> None:
+        """Record the outputs built from a source."""
+        entry = self._get_stat(stat_result)
+        entry["outputs"] = [list(output) for output in outputs]
+        self.entries[source] = entry
+
+    def remove(self, source: str) -> List[List[str]]:
+        """Remove a source, returning the outputs it had."""
+        entry = self.entries.pop(source, None)
+        return entry.get("outputs", []) if entry else []
+
+    def remove_written(self, path: str) -> None:
+        """Stop recording a file written to the build directory."""
+        self.written.pop(os.path.relpath(path, self.directory), None)
+
+    def add_written(self, path: str) -> None:
+        """Record a file written to the build directory, if it exists.
+
+        Links are recorded themselves, not the files they point to.
+        """
+        try:
+            stat_result = os.lstat(path)
+        except OSError:
+            return
+        self.written[os.path.relpath(path, self.directory)] = [
+            stat_result.st_size, stat_result.st_mtime_ns]
+
+    def get_stale(self) -> List[str]:
+        """Get the files written by the previous build but not this one.
+
+        Files that were changed since the previous build are not included.
+
+        Returns:
+            The paths of the files.
+        """
+        stale = []
+        for relpath, previous_stat in self._previous_written.items():
+            if relpath in self.written:
+                continue
+            path = os.path.join(self.directory, relpath)
+            try:
+                # A symlink to a removed source is still stale
+                stat_result = os.lstat(path)
+            except OSError:
+                continue
+            if [stat_result.st_size, stat_result.st_mtime_ns] == previous_stat:
+                stale.append(path)
+        return stale
+
+    def delete(self) -> None:
+        """Delete the saved manifest, if any."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def save(self) -> None:
+        """Save the entries recorded in this build."""
+        data = {
+            "version": self.version,
+            "config": self.fingerprint,
+            "files": self.entries,
+            "written": self.written,
+        }
+        directory = os.path.dirname(self.path)
+        temp_path = None
+        try:
+            make_private_directory(directory)
+            handle, temp_path = tempfile.mkstemp(
+                prefix=os.path.basename(self.path), dir=directory)
+            with os.fdopen(handle, "w", encoding="utf-8") as manifest_file:
+                # dumps uses the C encoder, which dump to a file doesn't
+                manifest_file.write(json.dumps(data))
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            # The manifest only speeds up later builds, so this isn't a
+            # warning that fails a strict build
+            utils.log.debug(
+                "mkdocs-simple-plugin: could not save %s\n %s",
+                self.path, str(error))
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
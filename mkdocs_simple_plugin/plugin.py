@@ -87,10 +87,13 @@ mkdocs serve
 ```
 
 """
+import hashlib
 import os
+import shutil
 import tempfile
-import time
-from typing import Callable, Literal
+import threading
+from collections import UserString
+from typing import Callable, Iterable, List, Literal
 
 import yaml
 from mkdocs import config as mkdocs_config
@@ -100,7 +103,12 @@ from mkdocs.config.defaults import MkDocsConfig
 from mkdocs.livereload import LiveReloadServer
 from mkdocs.plugins import BasePlugin
 from mkdocs.structure.files import File, Files
+from mkdocs.utils.yaml import get_yaml_loader
+from watchdog.events import FileSystemEventHandler
 
+from mkdocs_simple_plugin.manifest import (
+    BuildManifest, get_fingerprint, get_state_dir, lock_directory,
+    make_private_directory)
 from mkdocs_simple_plugin.simple import Simple
 
 
@@ -166,7 +174,11 @@ class SimplePlugin(BasePlugin):
         # ### build_dir
         #
         # If set, the directory where docs will be collated to be build.
-        # Otherwise, the build docs directory will be a temporary directory.
+        # Otherwise, the build docs directory will be a directory for the
+        # project in the user's cache directory, which is kept so later builds
+        # can reuse its outputs.
+        # If another mkdocs process is using it, a temporary directory is used
+        # instead, which is removed when mkdocs exits.
         ('build_dir', config_options.Type(str, default='')),
         #
         # #### copy
@@ -175,6 +187,86 @@ class SimplePlugin(BasePlugin):
         # Otherwise, files will be used in place.
         ('copy', config_options.Type(bool, default=False)),
         #
+        # #### copy_threads
+        #
+        # The number of threads that copy files in the background while other
+        # files are processed.
+        # If 0, files are copied one at a time.
+        ('copy_threads', config_options.Type(int, default=4)),
+        #
+        # #### link_mode
+        #
+        # How files are copied to the build_dir: `copy`, `hardlink`, `reflink`
+        # (a copy that shares data with the original until either changes) or
+        # `symlink`.
+        # If a file can't be linked this way, the next cheapest way is used,
+        # in the order `symlink`, `hardlink`, `reflink`, `copy`.
+        ('link_mode',
+            config_options.Choice(
+                ("copy", "hardlink", "reflink", "symlink"), default="copy")),
+        #
+        # ### cache_dir
+        #
+        # If set, the directory where the documentation extracted from source
+        # files is cached, keyed by the content of each file.
+        # Restoring this directory between builds (for example in CI, where
+        # a fresh checkout changes all modification times) skips extracting
+        # from files that haven't changed.
+        # The value can be read from an environment variable with
+        # `!ENV [VARIABLE_NAME, '']`.
+        ('cache_dir', config_options.Type(str, default='')),
+        #
+        # #### cache_size
+        #
+        # The maximum size of the cache, in megabytes.
+        # The least recently used entries are removed beyond this size.
+        ('cache_size', config_options.Type(int, default=512)),
+        #
+        # ### text_sample_size
+        #
+        # The number of bytes read from the start of a file to check that it is
+        # text before extracting from it.
+        # A file is skipped if the sample has a NUL byte or isn't valid UTF-8.
+        ('text_sample_size', config_options.Type(int, default=8192)),
+        #
+        # ### strict_text_check
+        #
+        # If true, the whole file must be valid UTF-8 to be extracted from,
+        # instead of only a sample from its start.
+        ('strict_text_check', config_options.Type(bool, default=False)),
+        #
+        # ### max_file_size
+        #
+        # Files larger than this number of bytes will not be extracted from.
+        # If 0, there is no limit.
+        ('max_file_size', config_options.Type(int, default=0)),
+        #
+        # ### extract_engine
+        #
+        # How documentation is extracted from source files.
+        #
+        # - `stream` reads each file line by line.
+        # - `block` reads each file at once and skips the lines outside of
+        #   extraction blocks that can't start or terminate one, which is
+        #   faster for large files. The output is the same.
+        ('extract_engine',
+            config_options.Choice(("stream", "block"), default="stream")),
+        #
+        # ### mmap_threshold
+        #
+        # Files of at least this number of bytes are mapped into memory
+        # instead of being read, and only the lines that may be extracted are
+        # decoded, so very large files don't need to fit in memory.
+        # If 0, files are always read.
+        ('mmap_threshold', config_options.Type(int, default=64 * 1024 * 1024)),
+        #
+        # ### workers
+        #
+        # The number of processes to extract documentation from files in.
+        # If 0, one process is used per CPU.
+        # The outputs are the same as when building in a single process.
+        ('workers', config_options.Type(int, default=1)),
+        #
         # ### include_extensions (renamed)
         #
         # Renamed [include](#include)
@@ -299,14 +391,23 @@ class SimplePlugin(BasePlugin):
     def __init__(self):
         """Set up internal variables."""
         self.orig_docs_dir = None
-        # Create a temporary build directory, and set some options to serve it
-        # PY2 returns a byte string by default. The Unicode prefix ensures a
-        # Unicode string is returned. And it makes MkDocs temp dirs easier to
-        # identify.
-        self.tmp_build_dir = tempfile.mkdtemp(prefix="mkdocs_simple_")
+        # The build directory is chosen when the config is first loaded.
+        # mkdocs keeps the plugin between serve reloads since it has
+        # on_startup, so the directory and its outputs are reused.
+        self.tmp_build_dir = None
+        # Lock of the project build directory, if it is used
+        self._build_dir_lock = None
         self.paths = None
+        self.simple = None
+        self.simple_fingerprint = None
+        # Paths changed since the last build, tracked once serving
+        self.changed_paths = None
+        self._observer = None
+        self._watches = []
+        self._changed_lock = threading.Lock()
         self.dirty = False
-        self.last_build_time = None
+        # Whether the build manifest is saved for later processes
+        self.persist_manifest = False
 
     def on_startup(self,
                    *,
@@ -317,21 +418,53 @@ class SimplePlugin(BasePlugin):
         """Configure the plugin on startup."""
         self.dirty = dirty
 
+    def on_shutdown(self):
+        """Remove the watches and the temporary build directory, if any."""
+        self.unwatch_directories()
+        if self._build_dir_lock:
+            # The project build directory is kept for later builds
+            self._build_dir_lock.close()
+            self._build_dir_lock = None
+        elif self.tmp_build_dir:
+            # The manifest of the directory won't be used again
+            BuildManifest(self.tmp_build_dir, "").delete()
+            shutil.rmtree(self.tmp_build_dir, ignore_errors=True)
+        self.tmp_build_dir = None
+
+    def get_build_dir(self, config_file_path: str) -> str:
+        """Get the build directory of the project, if no other process has it.
+
+        Otherwise, a temporary directory is created.
+        """
+        directory = get_project_build_dir(config_file_path)
+        try:
+            make_private_directory(os.path.dirname(directory))
+            self._build_dir_lock = lock_directory(directory)
+            if self._build_dir_lock:
+                make_private_directory(directory)
+                return directory
+        except OSError as error:
+            utils.log.debug(
+                "mkdocs-simple-plugin: could not use %s\n %s",
+                directory, str(error))
+            if self._build_dir_lock:
+                self._build_dir_lock.close()
+                self._build_dir_lock = None
+        utils.log.info(
+            "mkdocs-simple-plugin: %s is not available, building in a "
+            "temporary directory", directory)
+        return tempfile.mkdtemp(prefix="mkdocs_simple_")
+
     def on_config(self, config: MkDocsConfig):
         """Update configuration to use a temporary build directory."""
-        # Save the config for documentation
-        default_config = dict((name, config_option.default)
-                              for name, config_option in self.config_scheme)
-        config['mkdocs_simple_config'] = yaml.dump(
-            default_config,
-            sort_keys=False,
-            default_flow_style=False,
-            allow_unicode=True,
-            encoding=None)
+        # Save the config for documentation, dumped only if it's used
+        config['mkdocs_simple_config'] = DEFAULT_CONFIG_YAML
 
         # Read previous config first so updates don't get overwritten
         config_site_dir = get_config_site_dir(config.config_file_path)
 
+        # The manifest is only saved where a later process can use it
+        self.persist_manifest = self.dirty or bool(self.config['build_dir'])
         # If the build_dir isn't set by the user,
         # set it to one of the following locations:
         if not self.config['build_dir']:
@@ -339,8 +472,13 @@ class SimplePlugin(BasePlugin):
                 # the build_dir to the docs_dir if merging
                 self.config['build_dir'] = config['docs_dir']
             else:
-                # or a temp directory
+                # or the build directory of the project
+                if not self.tmp_build_dir:
+                    self.tmp_build_dir = self.get_build_dir(
+                        config.config_file_path)
                 self.config['build_dir'] = self.tmp_build_dir
+                if self._build_dir_lock:
+                    self.persist_manifest = True
 
         utils.log.info(
             "mkdocs-simple-plugin: build_dir: %s",
@@ -365,27 +503,41 @@ class SimplePlugin(BasePlugin):
         if self.config['merge_docs_dir']:
             self.config["ignore_paths"].append(
                 os.path.abspath(config['docs_dir']))
+        if self.config['cache_dir']:
+            self.config["ignore_paths"].append(
+                os.path.abspath(self.config['cache_dir']))
         return config
 
     def on_files(self, files: Files, /, *,
                  config: MkDocsConfig):
         """Update files based on plugin settings."""
-        # Configure simple
-        simple = Simple(**self.config)
+        # Configure simple, reusing the previous instance unless the settings
+        # changed
+        settings = dict(self.config, persist_manifest=self.persist_manifest)
+        fingerprint = get_fingerprint(settings)
+        if self.simple is None or fingerprint != self.simple_fingerprint:
+            self.simple = Simple(**settings)
+            self.simple_fingerprint = fingerprint
+        simple = self.simple
 
         # Save paths to add to watch if serving
         do_copy = self.config["copy"]
-        self.paths = simple.build_docs(
-            self.dirty, self.last_build_time, do_copy)
-        self.last_build_time = time.time()
-
-        if not self.config["merge_docs_dir"]:
-            # If not merging, remove files that are from the docs dir
-            abs_docs_dir = os.path.abspath(config['docs_dir'])
-            for _, file in list(files.src_uris.items()):
-                if file.abs_src_path.startswith(abs_docs_dir):
-                    files.remove(file)
-
+        paths = None
+        if self.changed_paths is not None:
+            # Only rebuild the sources that changed while serving
+            with self._changed_lock:
+                changed, self.changed_paths = self.changed_paths, set()
+            paths = simple.build_changed(
+                simple.manifest, self.paths, changed, do_copy)
+        if paths is None:
+            paths = simple.build_docs(self.dirty, do_copy)
+        self.paths = paths
+
+        # Remove outputs whose sources are gone
+        stale = set(
+            os.path.abspath(path) for path in simple.remove_stale_outputs())
+
+        generated = {}
         for path in self.paths:
             file = File(
                 src_dir=os.path.abspath(path.output_root),
@@ -394,11 +546,32 @@ class SimplePlugin(BasePlugin):
                 use_directory_urls=config["use_directory_urls"]
             )
             file.generated_by = "mkdocs_simple_plugin"
-            if file.src_uri in files.src_uris:
-                files.remove(file)
-            files.append(file)
+            generated[file.src_uri] = file
+
+        # If not merging, remove files that are from the docs dir
+        docs_prefix = None
+        if not self.config["merge_docs_dir"]:
+            docs_prefix = os.path.join(os.path.abspath(config['docs_dir']), "")
+        reconcile_files(files, generated, stale, docs_prefix)
         return files
 
+    def unwatch_directories(self):
+        """Remove the watches added by on_serve."""
+        for handler, watch in self._watches:
+            try:
+                self._observer.remove_handler_for_watch(handler, watch)
+            except KeyError:
+                pass
+        self._watches = []
+
+    def is_watched(self, path: str) -> bool:
+        """Check if a path is watched, recording it as changed if it is."""
+        if not self.simple.is_watched(path):
+            return False
+        with self._changed_lock:
+            self.changed_paths.add(path)
+        return True
+
     def on_serve(self, server: LiveReloadServer, /, *, config: MkDocsConfig,
                  builder: Callable):
         """Add files to watch server."""
@@ -407,24 +580,264 @@ class SimplePlugin(BasePlugin):
         if self.config["build_dir"] in server._watched_paths:
             server.unwatch(self.config["build_dir"])
 
-        # watch all the doc files
-        for path in self.paths:
-            server.watch(path.input_path)
+        # watch the directories the doc files were found in, ignoring changes
+        # to files that would be ignored when building
+        kept = self.simple.kept_directories
+        watches = get_watch_directories(
+            kept, self.simple.pruned_directories)
+        self.changed_paths = set()
+        self.unwatch_directories()
+        self._observer = server.observer
+        self._watches = [
+            watch_directory(server, path, self.is_watched, recursive)
+            for path, recursive in watches]
+        # Each directory below a recursive watch is watched as well
+        utils.log.info(
+            "mkdocs-simple-plugin: Watching %d directories with %d watches "
+            "for %d files", len(kept), len(watches), len(self.paths))
 
         return server
 
 
+def get_watch_directories(
+        kept: Iterable[str], pruned: Iterable[str]) -> List[tuple]:
+    """Get the fewest watches that cover the kept directories.
+
+    A directory is watched recursively if no directory below it was pruned,
+    and the directories below it are then left out. Otherwise it is watched
+    on its own, so the pruned directories aren't watched.
+
+    Args:
+        kept (Iterable[str]): The directories to watch
+        pruned (Iterable[str]): The directories not to watch
+
+    Returns:
+        A list of (path, recursive) pairs, with absolute paths.
+    """
+    # Directories that have a pruned directory below them
+    partial = set()
+    for path in pruned:
+        directory = os.path.dirname(os.path.abspath(path))
+        while directory not in partial:
+            partial.add(directory)
+            directory = os.path.dirname(directory)
+    watches = []
+    recursive = set()
+    for directory in sorted(set(os.path.abspath(path) for path in kept)):
+        parent = os.path.dirname(directory)
+        while parent not in recursive and os.path.dirname(parent) != parent:
+            parent = os.path.dirname(parent)
+        if parent in recursive:
+            continue
+        if directory not in partial:
+            recursive.add(directory)
+        watches.append((directory, directory not in partial))
+    return watches
+
+
+def watch_directory(server: LiveReloadServer, path: str,
+                    is_watched: Callable[[str], bool],
+                    recursive: bool = True) -> tuple:
+    """Watch a directory, only rebuilding for changes to watched files.
+
+    This follows LiveReloadServer.watch, but filters the events so changes to
+    ignored files don't trigger a rebuild. The watch is kept out of the
+    server's own bookkeeping, so it doesn't change the watches of mkdocs or
+    other plugins on the same directory.
+
+    Returns:
+        The (handler, watch) pair to remove the watch with.
+    """
+    # pylint: disable=protected-access
+    def callback(event):
+        if event.is_directory:
+            return
+        event_paths = [event.src_path, getattr(event, "dest_path", "")]
+        # Check every path, so both sides of a move are seen
+        watched = [event_path for event_path in event_paths
+                   if event_path and is_watched(event_path)]
+        if not watched:
+            return
+        with server._rebuild_cond:
+            server._want_rebuild = True
+            server._rebuild_cond.notify_all()
+
+    handler = FileSystemEventHandler()
+    handler.on_any_event = callback
+    watch = server.observer.schedule(
+        handler, os.path.abspath(path), recursive=recursive)
+    return handler, watch
+
+
+class LazyString(UserString):
+    """String that is only created when it is first used.
+
+    Operations on the string return plain UserString values.
+    """
+
+    _data = None
+    _create = None
+
+    def __init__(self, seq=None, create: Callable[[], str] = None):
+        """Initialize with a string, or a function that creates it."""
+        # pylint: disable=super-init-not-called
+        if create is None:
+            super().__init__(seq)
+        else:
+            self._create = create
+
+    @property
+    def data(self) -> str:
+        """Returns the string, creating it the first time."""
+        if self._data is None:
+            self._data = self._create()
+        return self._data
+
+    @data.setter
+    def data(self, value: str) -> None:
+        self._data = value
+
+
+def get_default_config_yaml() -> str:
+    """Returns the default settings of the plugin as YAML."""
+    default_config = dict((name, config_option.default)
+                          for name, config_option in SimplePlugin.config_scheme)
+    return yaml.dump(
+        default_config,
+        sort_keys=False,
+        default_flow_style=False,
+        allow_unicode=True,
+        encoding=None)
+
+
+# The default settings don't change, so they are only dumped once
+DEFAULT_CONFIG_YAML = LazyString(create=get_default_config_yaml)
+
+
+def reconcile_files(files: Files, generated: dict, stale: set,
+                    docs_prefix: str = None) -> None:
+    """Merge generated files into the files found by mkdocs.
+
+    The files are reconciled in a single pass, so the time taken is linear in
+    the number of files.
+
+    Args:
+        files: The files found by mkdocs, updated in place.
+        generated: The generated files by source URI, which replace existing
+            files with the same URI.
+        stale: The absolute paths of removed outputs.
+        docs_prefix: If set, files with a source path starting with this prefix
+            are removed.
+    """
+    for file in list(files):
+        abs_src_path = file.abs_src_path or ""
+        if file.src_uri in generated or abs_src_path in stale or \
+                (docs_prefix and abs_src_path.startswith(docs_prefix)):
+            files.remove(file)
+    for file in generated.values():
+        files.append(file)
+
+
+def get_project_build_dir(config_file_path: str) -> str:
+    """Get the build directory of a project in the state directory.
+
+    The directory is derived from the path of the mkdocs.yml file, or the
+    current directory if there is none, so it is the same each time the plugin
+    is loaded for a project.
+    """
+    project_path = os.path.abspath(config_file_path or os.getcwd())
+    digest = hashlib.sha256(project_path.encode("utf-8")).hexdigest()
+    return get_state_dir("build", digest)
+
+
+class _SiteDirLoader(get_yaml_loader(yaml.SafeLoader)):
+    """YAML loader for the site_dir of a config, with !ENV tags.
+
+    Other tags, such as python names, are loaded as None rather than being
+    constructed.
+    """
+
+
+_SiteDirLoader.add_multi_constructor(
+    "", lambda loader, suffix, node: None)
+
+# Site directory by config file path, with the stat of each file it was read
+# from
+_site_dir_cache = {}
+
+
+def _get_stamps(paths: List[str]) -> tuple:
+    """Returns the size and modification time of files."""
+    stamps = []
+    for path in paths:
+        stat_result = os.stat(path)
+        stamps.append((path, stat_result.st_size, stat_result.st_mtime_ns))
+    return tuple(stamps)
+
+
+def _read_site_dir(config_file_path: str, paths: List[str]) -> str:
+    """Read site_dir from a config file or the configs it inherits.
+
+    Args:
+        config_file_path (str): The path of the config file
+        paths (List[str]): Updated with the paths of the files read
+
+    Returns:
+        The site_dir as written in the config, or None if it isn't set.
+    """
+    paths.append(config_file_path)
+    with open(config_file_path, "rb") as config_file:
+        data = yaml.load(config_file, Loader=_SiteDirLoader)
+    if not isinstance(data, dict):
+        return None
+    if data.get("site_dir") is not None:
+        return data["site_dir"]
+    if data.get("INHERIT"):
+        return _read_site_dir(os.path.normpath(os.path.join(
+            os.path.dirname(config_file_path), data["INHERIT"])), paths)
+    return None
+
+
+def _get_site_dir(config_file_path: str) -> str:
+    """Get the absolute site_dir of a config file, using the cache."""
+    cached = _site_dir_cache.get(config_file_path)
+    if cached:
+        stamps, site_dir = cached
+        try:
+            if _get_stamps([path for path, _, _ in stamps]) == stamps:
+                return site_dir
+        except OSError:
+            pass
+    paths = []
+    try:
+        site_dir = _read_site_dir(config_file_path, paths)
+        stamps = _get_stamps(paths)
+    except (OSError, yaml.YAMLError):
+        # Let mkdocs report the error
+        return mkdocs_config.load_config(config_file_path).data['site_dir']
+    # Like mkdocs, relative paths are relative to the config file
+    site_dir = os.path.abspath(os.path.join(
+        os.path.dirname(config_file_path), site_dir or "site"))
+    _site_dir_cache[config_file_path] = (stamps, site_dir)
+    return site_dir
+
+
 def get_config_site_dir(config_file_path: str) -> str:
     """Get configuration directory from mkdocs.yml file.
 
     This is needed in the case you are running mkdocs serve, which
     overwrites the path with a temporary one.
+
+    Only site_dir is read from the YAML of the file, following !ENV tags and
+    INHERIT, and the result is cached until the files change.
     """
-    orig_config = mkdocs_config.load_config(config_file_path)
     utils.log.debug(
         "mkdocs-simple-plugin: loading file: %s", config_file_path)
+    if not config_file_path:
+        site_dir = mkdocs_config.load_config(config_file_path).data['site_dir']
+    else:
+        site_dir = _get_site_dir(os.path.abspath(config_file_path))
 
     utils.log.debug(
-        "mkdocs-simple-plugin: User config site_dir: %s",
-        orig_config.data['site_dir'])
-    return orig_config.data['site_dir']
+        "mkdocs-simple-plugin: User config site_dir: %s", site_dir)
+    return site_dir
@@ -1,12 +1,70 @@
 """Semiliterate module handles document extraction from source files."""
-from io import TextIOWrapper
+from io import StringIO, TextIOBase, TextIOWrapper
+import functools
+import mmap
 import os
 import re
+import threading
 
 from dataclasses import dataclass
 
 from mkdocs import utils
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse  # pylint: disable=deprecated-module
+
+
+def _open_text(path: str, text: str = None) -> TextIOWrapper:
+    """Returns a text stream of the content, or of the file if not given.
+
+    Either way, lines are split with universal newlines.
+    """
+    if text is not None:
+        return StringIO(text, newline=None)
+    return open(path, 'r', encoding='utf-8')
+
+
+def _collect_literals(items: sre_parse.SubPattern, runs: list) -> None:
+    """Collect the runs of literal text in a parsed regex.
+
+    Each run is text that is contiguous in every match. A new run is started
+    after anything that isn't a plain literal.
+    """
+    for opcode, argument in items:
+        if opcode is sre_parse.LITERAL:
+            runs[-1] += chr(argument)
+        elif opcode is sre_parse.AT:
+            # Anchors don't consume any text
+            continue
+        elif opcode is sre_parse.SUBPATTERN and not any(argument[1:3]):
+            _collect_literals(argument[-1], runs)
+        elif opcode in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) \
+                and argument[0] >= 1:
+            # The first repetition follows the text before it
+            _collect_literals(argument[2], runs)
+            runs.append("")
+        else:
+            runs.append("")
+
+
+@functools.lru_cache(maxsize=256)
+def _get_required_literal(pattern: re.Pattern) -> str:
+    """Returns the longest literal text that every match of a pattern contains.
+
+    Returns None if there is no such text.
+    """
+    if not pattern or not isinstance(pattern.pattern, str) or \
+            pattern.flags & re.IGNORECASE:
+        return None
+    runs = [""]
+    _collect_literals(sre_parse.parse(pattern.pattern, pattern.flags), runs)
+    # Lines are matched after their line endings are translated, so only text
+    # between line endings is sure to be in the file as is.
+    literals = [literal for run in runs for literal in re.split(r'[\r\n]', run)]
+    return max(literals, key=len) or None
+
 
 def _get_match(pattern: re.Pattern, line: str) -> re.Match:
     """Returns the match for the given pattern."""
@@ -15,6 +73,55 @@ def _get_match(pattern: re.Pattern, line: str) -> re.Match:
     return pattern.search(line)
 
 
+# Backreferences and conditionals, which depend on group numbers
+_BACKREFERENCE_PATTERN = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def _can_combine(pattern: re.Pattern) -> bool:
+    """Returns true if the pattern matches the same inside a larger pattern.
+
+    Flags apply to the whole of a pattern, and backreferences and conditionals
+    refer to groups by number, so patterns that use them can't be combined.
+    """
+    return isinstance(pattern.pattern, str) and \
+        not pattern.flags & ~re.UNICODE and \
+        not _BACKREFERENCE_PATTERN.search(pattern.pattern)
+
+
+def _is_anchored(pattern: re.Pattern) -> bool:
+    """Returns true if the pattern can only match at the start of a string."""
+    items = sre_parse.parse(pattern.pattern, pattern.flags)
+    return not pattern.flags & re.MULTILINE and len(items) > 0 and \
+        items[0] in ((sre_parse.AT, sre_parse.AT_BEGINNING),
+                     (sre_parse.AT, sre_parse.AT_BEGINNING_STRING))
+
+
+@functools.lru_cache(maxsize=256)
+def _combine_start_patterns(starts: tuple) -> tuple:
+    """Combine the start patterns that can only match at the start of a line.
+
+    Args:
+        starts (tuple): The start pattern of each extraction, or None
+
+    Returns:
+        A (combined, indexes) pair, where combined is a pattern to match at
+        the start of a line, with a group `start<index>` for each of the
+        start patterns it combines, and indexes is the set of their indexes.
+        combined is None if no patterns can be combined.
+    """
+    indexes = [
+        index for index, start in enumerate(starts)
+        if start and _can_combine(start) and _is_anchored(start)]
+    if not indexes:
+        return None, frozenset()
+    try:
+        combined = re.compile("|".join(
+            f"(?P<start{index}>{starts[index].pattern})" for index in indexes))
+    except re.error:
+        return None, frozenset()
+    return combined, frozenset(indexes)
+
+
 @dataclass
 class InlineParams:
     """Inline parameters for extraction."""
@@ -198,18 +305,59 @@ class ExtractionPattern:
         return line
 
 
+# Directories that outputs were written to, so they aren't created again
+_created_directories = set()
+
+
+def _make_directory(directory: str) -> None:
+    """Create a directory and its parents, unless it was created before."""
+    if directory not in _created_directories:
+        os.makedirs(directory, exist_ok=True)
+        _created_directories.add(directory)
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    """Write data to a file, unless the file already has the same content.
+
+    The data is written to a temporary file that then replaces the file, so
+    the file is never seen partly written.
+
+    Returns:
+        True if the file was written.
+    """
+    try:
+        if os.stat(path).st_size == len(data):
+            with open(path, 'rb') as existing_file:
+                if existing_file.read() == data:
+                    return False
+    except OSError:
+        pass
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
+
+
 class LazyFile:
-    """Create the file only if a non-empty string is written.
+    """Create the file only if a string is written.
 
-    Like a file object, but only ever creates the directory and opens the
-    file if a non-empty string is written.
+    Like a file object, but the lines written are kept in memory until the
+    file is closed. Only then is the directory created, and the file is only
+    written if its content changed, so unchanged outputs keep their
+    modification time.
     """
 
     def __init__(self, directory: str, name: str):
         """Initialize with a directory and file name."""
         self.file_directory = directory
         self.file_name = name
-        self.file_object = None
+        self._lines = None
 
     def __eq__(self, other) -> bool:
         """Check equality if directory and names are the same."""
@@ -221,29 +369,44 @@ class LazyFile:
         return os.path.join(self.file_directory, self.file_name)
 
     def write(self, arg: str) -> None:
-        """Create and write a string line to the file, iff not none."""
+        """Write a string line to the file, iff not none."""
         if arg is None:
             return
-        if self.file_object is None:
-            filename = os.path.join(self.file_directory, self.file_name)
-            os.makedirs(self.file_directory, exist_ok=True)
-            self.file_object = open(filename, 'w+')
+        if self._lines is None:
+            self._lines = []
 
         def get_line(line: str) -> str:
             """Returns line with EOL."""
             return line if line.endswith("\n") else line + '\n'
 
-        self.file_object.write(get_line(arg))
+        self._lines.append(get_line(arg))
+
+    def discard(self) -> None:
+        """Drop the lines written, without creating the file."""
+        self._lines = None
 
     def close(self) -> str:
         """Finish the file."""
-        if self.file_object is not None:
-            file_path = os.path.join(self.file_directory, self.file_name)
-            utils.log.debug("        ... extracted %s", file_path)
-            self.file_object.close()
-            self.file_object = None
-            return file_path
-        return None
+        if self._lines is None:
+            return None
+        file_path = os.path.join(self.file_directory, self.file_name)
+        content = "".join(self._lines)
+        self._lines = None
+        if os.linesep != "\n":
+            content = content.replace("\n", os.linesep)
+        data = content.encode('utf-8')
+        _make_directory(self.file_directory)
+        try:
+            written = _write_if_changed(file_path, data)
+        except FileNotFoundError:
+            # The directory was removed since it was created
+            _created_directories.discard(self.file_directory)
+            _make_directory(self.file_directory)
+            written = _write_if_changed(file_path, data)
+        utils.log.debug(
+            "        ... extracted %s%s",
+            file_path, "" if written else " (unchanged)")
+        return file_path
 
 
 class StreamExtract:
@@ -270,6 +433,19 @@ class StreamExtract:
         self._streams = {
             output_stream.file_name: output_stream
         }
+        self._start = None
+        self._search_indexes = []
+
+    @staticmethod
+    def open_input(path: str, text: str = None) -> TextIOWrapper:
+        """Open the input of the extraction.
+
+        Args:
+            path (str): The path of the input file
+            text (str): The decoded content of the file, if already read
+
+        """
+        return _open_text(path, text)
 
     def _try_extract_match(
             self,
@@ -293,6 +469,11 @@ class StreamExtract:
             self._output_files.append(file)
         return self._output_files
 
+    def discard(self) -> None:
+        """Drop the output that hasn't been written yet."""
+        for stream in self._streams.values():
+            stream.discard()
+
     def set_output_file(self, filename: str) -> LazyFile:
         """Set the current output stream from filename and return the stream."""
         output_stream = self.output_stream
@@ -321,36 +502,86 @@ class StreamExtract:
         Returns:
             A list of files extracted.
         """
+        active_pattern = self._setup_patterns()
+        for line in self.input_stream:
+            active_pattern, terminated = self._process_line(
+                line, active_pattern)
+            if terminated:
+                break
+        return self.close()
+
+    def _setup_patterns(self) -> ExtractionPattern:
+        """Index the start patterns and return the initially active pattern."""
         active_pattern = None if self.patterns else ExtractionPattern()
         patterns = self.patterns if self.patterns else []
         for pattern in patterns:
             if not pattern.start:
                 active_pattern = pattern
+        self._start, combined_indexes = _combine_start_patterns(
+            tuple(pattern.start for pattern in patterns))
+        # Patterns whose start is searched for on its own
+        self._search_indexes = [
+            index for index, pattern in enumerate(patterns)
+            if pattern.start and index not in combined_indexes]
+        return active_pattern
 
-        for line in self.input_stream:
-            # Check terminate, regardless of state:
-            if self._try_extract_match(
-                    _get_match(self.terminate, line), active_pattern):
-                return self.close()
-            # Change state if flagged to do so:
-            if active_pattern is None:
-                for pattern in patterns:
-                    start = _get_match(pattern.start, line)
-                    if start:
-                        active_pattern = pattern
-                        active_pattern.setup(line)
-                        self.set_output_file(active_pattern.get_filename())
-                        self._try_extract_match(start)
-                        break
-                continue
-            # We are extracting. See if we should stop:
-            if self._try_extract_match(_get_match(active_pattern.stop, line)):
-                active_pattern = None
-                self.set_output_stream(self._default_stream)
-                continue
-            # Extract all other lines in the normal way:
-            self.extract_line(line, active_pattern)
-        return self.close()
+    def _process_line(
+            self,
+            line: str,
+            active_pattern: ExtractionPattern) -> tuple:
+        """Process a line of the input.
+
+        Returns:
+            The active pattern after the line, and whether extraction was
+            terminated.
+        """
+        # Check terminate, regardless of state:
+        if self._try_extract_match(
+                _get_match(self.terminate, line), active_pattern):
+            return active_pattern, True
+        # Change state if flagged to do so:
+        if active_pattern is None:
+            pattern, start = self._match_start(line)
+            if start:
+                active_pattern = pattern
+                active_pattern.setup(line)
+                self.set_output_file(active_pattern.get_filename())
+                self._try_extract_match(start)
+            return active_pattern, False
+        # We are extracting. See if we should stop:
+        if self._try_extract_match(_get_match(active_pattern.stop, line)):
+            self.set_output_stream(self._default_stream)
+            return None, False
+        # Extract all other lines in the normal way:
+        self.extract_line(line, active_pattern)
+        return active_pattern, False
+
+    def _match_start(self, line: str) -> tuple:
+        """Find the first pattern whose start matches the line.
+
+        The start patterns that can only match at the start of the line are
+        checked with one combined match. The others are only searched for if
+        they come before the one that matched.
+
+        Returns:
+            The pattern and the match of its start, or (None, None).
+        """
+        first = len(self.patterns)
+        if self._start is not None:
+            combined = self._start.match(line)
+            if combined:
+                first = int(combined.lastgroup[len("start"):])
+        for index in self._search_indexes:
+            if index > first:
+                break
+            start = self.patterns[index].start.search(line)
+            if start:
+                return self.patterns[index], start
+        if first < len(self.patterns):
+            # Match again for the groups of the pattern itself
+            pattern = self.patterns[first]
+            return pattern, pattern.start.search(line)
+        return None, None
 
     def extract_line(self, line: str, extraction_pattern: re.Pattern) -> None:
         """Copy line to the output stream, applying specified replacements."""
@@ -358,6 +589,179 @@ class StreamExtract:
         self.output_stream.write(line)
 
 
+class BlockExtract(StreamExtract):
+    """Extract files to an output stream, finding blocks in the whole input.
+
+    The input is read at once. While no extraction is active, the lines that
+    can't contain a start or terminate pattern are skipped with a substring
+    search for the literal text those patterns require, so only the blocks
+    and their start lines are processed line by line. The output is the same
+    as StreamExtract.
+    """
+
+    def extract(self, **kwargs) -> list:
+        """Extract from file with semiliterate configuration.
+
+        Returns:
+            A list of files extracted.
+        """
+        text = self.input_stream.read()
+        active_pattern = self._setup_patterns()
+        literals = self._get_literals()
+        found = {}
+        position = 0
+        while position < len(text):
+            if active_pattern is None and literals is not None:
+                candidate = self._find_candidate(
+                    text, position, literals, found)
+                if candidate < 0:
+                    break
+                # Skip to the start of the line with the candidate
+                position = max(
+                    position, text.rfind("\n", position, candidate) + 1)
+            line_end = text.find("\n", position) + 1 or len(text)
+            active_pattern, terminated = self._process_line(
+                text[position:line_end], active_pattern)
+            if terminated:
+                break
+            position = line_end
+        return self.close()
+
+    def _get_literals(self) -> list:
+        """Returns literals of which a line must contain one to start or end.
+
+        Returns:
+            The literals, or None if every line must be checked.
+        """
+        patterns = [pattern.start for pattern in self.patterns or []
+                    if pattern.start]
+        if self.terminate:
+            patterns.append(self.terminate)
+        literals = []
+        for pattern in patterns:
+            literal = _get_required_literal(pattern)
+            if not literal:
+                return None
+            if literal not in literals:
+                literals.append(literal)
+        return literals
+
+    @staticmethod
+    def _find_candidate(
+            text: str,
+            position: int,
+            literals: list,
+            found: dict) -> int:
+        """Find the first position of any literal in the text from position.
+
+        Args:
+            text (str): The text to search
+            position (int): Where to search from
+            literals (list): The literals to search for
+            found (dict): The position of each literal found by earlier
+                searches, which is updated
+
+        Returns:
+            The position, or -1 if no literal is found.
+        """
+        first = -1
+        for literal in literals:
+            index = found.get(literal)
+            if index is None or 0 <= index < position:
+                index = text.find(literal, position)
+                found[literal] = index
+            if index >= 0 and (first < 0 or index < first):
+                first = index
+        return first
+
+
+def _split_lines(text: str) -> list:
+    """Split text into lines with universal newlines, like a text file."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+class MmapExtract(BlockExtract):
+    """Extract files to an output stream from a memory map of the input.
+
+    Like BlockExtract, but the input file is mapped into memory instead of
+    read, literals are found in its bytes, and only the lines that are
+    processed are decoded. Memory use doesn't grow with the size of the file.
+    """
+
+    @staticmethod
+    def open_input(path: str, text: str = None) -> TextIOWrapper:
+        """Open the input file in binary mode, unless it was already read."""
+        if text is not None:
+            return _open_text(path, text)
+        return open(path, 'rb')
+
+    def extract(self, **kwargs) -> list:
+        """Extract from file with semiliterate configuration.
+
+        Returns:
+            A list of files extracted.
+        """
+        if isinstance(self.input_stream, TextIOBase):
+            return super().extract(**kwargs)
+        try:
+            data = mmap.mmap(
+                self.input_stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return self.close()
+        with data:
+            try:
+                self._extract_data(data)
+            except UnicodeDecodeError:
+                # Like the other engines, don't write the pending output of a
+                # file that isn't text
+                self.discard()
+                raise
+        return self.close()
+
+    def _extract_data(self, data: mmap.mmap) -> None:
+        """Extract from the bytes of the input."""
+        active_pattern = self._setup_patterns()
+        literals = self._get_literals()
+        if literals is not None:
+            literals = [literal.encode('utf-8') for literal in literals]
+        found = {}
+        position = 0
+        while position < len(data):
+            if active_pattern is None and literals is not None:
+                candidate = self._find_candidate(
+                    data, position, literals, found)
+                if candidate < 0:
+                    return
+                # Skip to the start of the line with the candidate
+                position = max(
+                    position,
+                    data.rfind(b"\n", position, candidate) + 1,
+                    data.rfind(b"\r", position, candidate) + 1)
+            line_end = data.find(b"\n", position) + 1 or len(data)
+            # Multi-byte characters never contain line endings, so each line
+            # can be decoded on its own.
+            for line in _split_lines(data[position:line_end].decode('utf-8')):
+                active_pattern, terminated = self._process_line(
+                    line, active_pattern)
+                if terminated:
+                    return
+            position = line_end
+
+
+# The extraction engines by name
+EXTRACT_ENGINES = {
+    "stream": StreamExtract,
+    "block": BlockExtract,
+    "mmap": MmapExtract,
+}
+
+
 class Semiliterate:
     """Extract documentation from source files using regex settings."""
 
@@ -419,6 +823,34 @@ class Semiliterate:
             extract = [extract]
         for extract_params in extract:
             self.extractions.append(ExtractionPattern(**extract_params))
+        self.required_literals = self._get_required_literals()
+
+    def _get_required_literals(self) -> list:
+        """Returns literals of which a file must contain one to be extracted.
+
+        Nothing is extracted from a file until a start pattern matches, so a
+        file that contains none of the literals required by the start patterns
+        has nothing to extract.
+
+        Returns:
+            The required literals, or None if any file may be extracted.
+        """
+        if not self.extractions:
+            return None
+        literals = []
+        for extraction in self.extractions:
+            literal = _get_required_literal(extraction.start)
+            if not literal:
+                return None
+            if literal not in literals:
+                literals.append(literal)
+        return literals
+
+    def may_extract(self, text: str) -> bool:
+        """Returns false if the text can't contain anything to extract."""
+        if self.required_literals is None:
+            return True
+        return any(literal in text for literal in self.required_literals)
 
     def filename_match(self, name: str) -> str:
         """Get the filename for the match, otherwise return None.
@@ -442,6 +874,8 @@ class Semiliterate:
             from_directory: str,
             from_file: str,
             destination_directory: str,
+            text: str = None,
+            engine: str = "stream",
             **kwargs) -> list:
         """Try to extract documentation from file with name.
 
@@ -449,18 +883,22 @@ class Semiliterate:
             from_directory (str): The source directory
             from_file (str): The source filename within directory
             destination_directory (str): The destination directory
+            text (str): The decoded content of the file, if already read
+            engine (str): The name of the extraction engine to use
 
-        Returns a list of extracted files.
+        Returns a list of extracted files, or None if reading or writing a file
+        failed.
         """
         to_file = self.filename_match(from_file)
         if not to_file:
             return []
         from_file_path = os.path.join(from_directory, from_file)
         try:
-            with open(from_file_path) as original_file:
+            engine_class = EXTRACT_ENGINES[engine]
+            with engine_class.open_input(from_file_path, text) as original_file:
                 utils.log.debug(
                     "mkdocs-simple-plugin: Scanning %s...", from_file_path)
-                extraction = StreamExtract(
+                extraction = engine_class(
                     input_stream=original_file,
                     output_stream=LazyFile(destination_directory, to_file),
                     terminate=self.terminate,
@@ -474,4 +912,123 @@ class Semiliterate:
         except (OSError, IOError) as error:
             utils.log.error("mkdocs-simple-plugin: could not build %s\n %s",
                             from_file_path, str(error))
+            return None
         return []
+
+
+# A regex pattern that only matches literal text
+_LITERAL_PATTERN = re.compile(r'(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*')
+
+
+def _get_literal(pattern: str) -> str:
+    """Returns the text a regex pattern matches, or None if not literal."""
+    if not _LITERAL_PATTERN.fullmatch(pattern):
+        return None
+    return re.sub(r'\\(.)', r'\1', pattern)
+
+
+def _classify_pattern(file_filter: re.Pattern) -> tuple:
+    """Classify a filename pattern by how it can be looked up.
+
+    Returns:
+        A (kind, literal) pair, where kind is "always" if the pattern matches
+        any name, "exact" if it only matches the literal name, "suffix" if it
+        matches names ending with the literal, and "regex" otherwise.
+    """
+    pattern = file_filter.pattern
+    if file_filter.flags & ~re.UNICODE or not isinstance(pattern, str):
+        return "regex", None
+    is_start = False
+    if pattern.startswith('^.*'):
+        pattern = pattern[3:]
+    elif pattern.startswith('^'):
+        pattern = pattern[1:]
+        is_start = True
+    elif pattern.startswith('.*'):
+        pattern = pattern[2:]
+    is_end = pattern.endswith('$') and not pattern.endswith('\\$')
+    if is_end:
+        pattern = pattern[:-1]
+    literal = _get_literal(pattern)
+    if literal is None:
+        return "regex", None
+    if is_start and is_end:
+        return "exact", literal
+    if is_end:
+        return "suffix", literal
+    if not is_start and not literal:
+        return "always", literal
+    return "regex", None
+
+
+def _wrap_pattern(index: int, pattern: str) -> str:
+    """Wrap a pattern so it sets a named group if it is found anywhere."""
+    return f"(?:(?=[\\s\\S]*?(?P<p{index}>{pattern})))?"
+
+
+class SemiliterateDispatch:
+    r"""Find the Semiliterate settings whose pattern matches a filename.
+
+    Patterns that match an exact filename (`^name$`) or a literal suffix
+    (`\.ext$`) are looked up in dictionaries. All other patterns are
+    combined into one regex with a named group for each pattern, so a single
+    search finds every one of them that matches.
+    """
+
+    def __init__(self, semiliterate: list):
+        """Build the dispatch index from a list of Semiliterate settings."""
+        self.semiliterate = list(semiliterate)
+        self._always = []
+        self._exact = {}
+        self._suffixes = {}
+        self._search = []
+        combined = []
+        for index, item in enumerate(self.semiliterate):
+            kind, literal = _classify_pattern(item.file_filter)
+            if kind == "always":
+                self._always.append(index)
+            elif kind == "exact":
+                self._exact.setdefault(literal, []).append(index)
+            elif kind == "suffix":
+                self._suffixes.setdefault(
+                    len(literal), {}).setdefault(literal, []).append(index)
+            else:
+                combined.append(index)
+        # Patterns with backreferences or inline flags can't be combined, so
+        # search them one at a time.
+        self._search.extend(
+            index for index in combined
+            if not _can_combine(self.semiliterate[index].file_filter))
+        combined = [index for index in combined if index not in self._search]
+        self._combined = None
+        self._combined_indexes = combined
+        if combined:
+            try:
+                self._combined = re.compile("".join(
+                    _wrap_pattern(index,
+                                  self.semiliterate[index].file_filter.pattern)
+                    for index in combined))
+            except re.error:
+                self._search.extend(combined)
+
+    def get_candidates(self, name: str) -> list:
+        """Returns the Semiliterate settings that match name, in order."""
+        if '\n' in name:
+            # `$` also matches before a trailing newline, so check every
+            # pattern the slow way.
+            return [item for item in self.semiliterate
+                    if item.file_filter.search(name)]
+        indexes = list(self._always)
+        indexes.extend(self._exact.get(name, ()))
+        for length, suffixes in self._suffixes.items():
+            if length <= len(name):
+                indexes.extend(suffixes.get(name[len(name) - length:], ()))
+        if self._combined:
+            match = self._combined.match(name)
+            indexes.extend(
+                index for index in self._combined_indexes
+                if match.group(f"p{index}") is not None)
+        indexes.extend(
+            index for index in self._search
+            if self.semiliterate[index].file_filter.search(name))
+        return [self.semiliterate[index] for index in sorted(indexes)]
@@ -1,15 +1,34 @@
 """Simple module handles document extraction from source files."""
+import bisect
+import codecs
+import concurrent.futures
+import errno
 import fnmatch
+import itertools
 import os
 import pathlib
+import re
+import shutil
 import stat
-from typing import List, Dict
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, List
 
 from shutil import copy2 as copy
 from dataclasses import dataclass
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 from mkdocs import utils
-from mkdocs_simple_plugin.semiliterate import Semiliterate
+from mkdocs_simple_plugin.cache import ExtractionCache
+from mkdocs_simple_plugin.manifest import BuildManifest, get_fingerprint
+from mkdocs_simple_plugin.semiliterate import (
+    Semiliterate,
+    SemiliterateDispatch,
+)
 
 
 @dataclass
@@ -20,6 +39,210 @@ class SimplePath:
     input_path: str
 
 
+def _get_entry_type(entry: os.DirEntry) -> tuple:
+    """Returns (is_dir, is_file) for a directory entry.
+
+    Symlinks to directories are neither, symlinks to files are files.
+    """
+    try:
+        is_dir = entry.is_dir(follow_symlinks=False)
+        return is_dir, not is_dir and entry.is_file()
+    except OSError:
+        return False, False
+
+
+class IgnoreMatcher:
+    """Match paths against a set of ignore globs.
+
+    All patterns are compiled into one alternation regex, so a path is checked
+    against every pattern in a single search. Verdicts are the same as calling
+    `fnmatch.fnmatch` with each pattern in turn.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile the glob patterns into a single matcher."""
+        self.patterns = frozenset(patterns)
+        self._match = None
+        if self.patterns:
+            regex = "|".join(
+                fnmatch.translate(os.path.normcase(pattern))
+                for pattern in sorted(self.patterns))
+            self._match = re.compile(regex).match
+
+    def match(self, path: str) -> bool:
+        """Returns true if the path matches any of the patterns."""
+        if self._match is None:
+            return False
+        return self._match(os.path.normcase(path)) is not None
+
+
+class PathPrefixIndex:
+    """Check if absolute paths are inside any of a set of paths.
+
+    The paths are kept as a sorted list of prefixes with nested paths removed,
+    so a lookup is a single bisect and string compare.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        """Build the index from absolute paths."""
+        self.prefixes = []
+        for prefix in sorted(set(self._key(path) for path in paths)):
+            if self.prefixes and prefix.startswith(self.prefixes[-1]):
+                continue
+            self.prefixes.append(prefix)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """Returns the path as a prefix that ends with a separator."""
+        return os.path.join(os.path.normcase(os.path.normpath(path)), '')
+
+    def contains(self, path: str) -> bool:
+        """Returns true if the absolute path is inside any indexed path."""
+        key = self._key(path)
+        index = bisect.bisect_right(self.prefixes, key)
+        return index > 0 and key.startswith(self.prefixes[index - 1])
+
+
+# The ioctl request that clones a file on Linux
+_FICLONE = 0x40049409
+
+
+def _get_temp_path(path: str) -> str:
+    """Returns a temporary path next to a path."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _replace_with(destination: str, create) -> None:
+    """Create a file at a temporary path, then move it to the destination."""
+    temp_path = _get_temp_path(destination)
+    try:
+        create(temp_path)
+        os.replace(temp_path, destination)
+    except OSError:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _symlink_file(source: str, destination: str) -> None:
+    """Link the destination to the source with a symbolic link."""
+    _replace_with(
+        destination, lambda path: os.symlink(os.path.abspath(source), path))
+
+
+def _hardlink_file(source: str, destination: str) -> None:
+    """Link the destination to the source with a hard link."""
+    _replace_with(destination, lambda path: os.link(source, path))
+
+
+def _reflink_file(source: str, destination: str) -> None:
+    """Clone the source, sharing its data until either file is changed."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported", source)
+
+    def clone(path: str) -> None:
+        with open(source, 'rb') as source_file, \
+                open(path, 'wb') as clone_file:
+            fcntl.ioctl(clone_file.fileno(), _FICLONE, source_file.fileno())
+        shutil.copystat(source, path)
+
+    _replace_with(destination, clone)
+
+
+def _copy_file(source: str, destination: str) -> None:
+    """Copy the source to the destination."""
+    # Don't write through a link to the source left by another mode
+    if os.path.islink(destination) or (
+            os.path.exists(destination) and
+            os.path.samefile(source, destination)):
+        os.remove(destination)
+    copy(source, destination)
+
+
+# The ways to link a file to a destination, from the cheapest
+LINK_MODES = {
+    "symlink": _symlink_file,
+    "hardlink": _hardlink_file,
+    "reflink": _reflink_file,
+    "copy": _copy_file,
+}
+
+
+def link_file(source: str, destination: str, mode: str = "copy") -> str:
+    """Copy or link a file to a destination path.
+
+    If the file can't be linked with the mode, the next cheapest mode is
+    tried, down to a copy.
+
+    Returns:
+        The mode used.
+    """
+    modes = list(LINK_MODES)
+    for fallback in modes[modes.index(mode):-1]:
+        try:
+            LINK_MODES[fallback](source, destination)
+            return fallback
+        except OSError as error:
+            utils.log.debug(
+                "mkdocs-simple-plugin: could not %s %s, %s",
+                fallback, source, str(error))
+    _copy_file(source, destination)
+    return "copy"
+
+
+class CopyPool:
+    """Copy files in background threads.
+
+    At most max_pending copies are queued at once; queueing another blocks
+    until one finishes, so the build doesn't run far ahead of the disk.
+    Errors are collected and returned when the pool is closed.
+    """
+
+    def __init__(self, threads: int, max_pending: int, link_mode="copy"):
+        """Initialize the pool with a number of threads."""
+        self.link_mode = link_mode
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="mkdocs_simple_copy")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._copies: Dict[str, concurrent.futures.Future] = {}
+        self.errors: List[tuple] = []
+
+    def copy(self, source: str, destination: str) -> None:
+        """Queue a copy of a file."""
+        self._slots.acquire()  # pylint: disable=consider-using-with
+        future = self._executor.submit(self._copy, source, destination)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._copies[os.path.normpath(destination)] = future
+
+    def _copy(self, source: str, destination: str) -> None:
+        """Copy a file, and record the error if it fails."""
+        try:
+            link_file(source, destination, self.link_mode)
+        except OSError as error:
+            self.errors.append((source, error))
+
+    def wait(self, paths: Iterable[str]) -> bool:
+        """Wait for the queued copies to any of the paths.
+
+        Returns:
+            True if any copy to the paths was queued.
+        """
+        futures = [self._copies.get(os.path.normpath(path)) for path in paths]
+        futures = [future for future in futures if future]
+        concurrent.futures.wait(futures)
+        return bool(futures)
+
+    def close(self) -> List[tuple]:
+        """Wait for all the copies to finish.
+
+        Returns:
+            A (source, error) pair for each copy that failed.
+        """
+        self._executor.shutdown(wait=True)
+        self._copies.clear()
+        return self.errors
+
+
 class Simple():
     """Mkdocs Simple Plugin"""
 
@@ -34,6 +257,17 @@ class Simple():
             ignore_hidden: bool,
             ignore_paths: list,
             semiliterate: list,
+            cache_dir: str = '',
+            cache_size: int = 512,
+            text_sample_size: int = 8192,
+            max_file_size: int = 0,
+            strict_text_check: bool = False,
+            extract_engine: str = "stream",
+            mmap_threshold: int = 64 * 1024 * 1024,
+            workers: int = 1,
+            copy_threads: int = 4,
+            link_mode: str = "copy",
+            persist_manifest: bool = True,
             **kwargs):
         """Initialize module instance with settings.
 
@@ -46,6 +280,23 @@ class Simple():
             ignore_paths (list): Absolute filepaths to exclude
             semiliterate (list): Settings for processing file content in
                 Semiliterate
+            cache_dir (str): Directory to cache extracted files in, if any
+            cache_size (int): Maximum size of the cache in megabytes
+            text_sample_size (int): Bytes read to check if a file is text
+            max_file_size (int): Size in bytes of the largest file to extract,
+                or 0 for no limit
+            strict_text_check (bool): Whether to decode the whole file to
+                check if it is text
+            extract_engine (str): Name of the engine to extract files with
+            mmap_threshold (int): Size in bytes from which files are extracted
+                from a memory map instead of being read, or 0 to never map
+            workers (int): Number of processes to build files in, or 0 for one
+                per CPU
+            copy_threads (int): Number of threads to copy files in, or 0 to
+                copy them one at a time
+            link_mode (str): How files are copied, one of LINK_MODES
+            persist_manifest (bool): Whether the manifest is saved for the
+                builds of later processes
 
         """
         self.build_dir = build_dir
@@ -55,53 +306,226 @@ class Simple():
         self.ignore_hidden = ignore_hidden  # TODO[athackst] deprecate
         self.hidden_prefix = set([".", "__"])  # TODO[athackst] deprecate
         self.ignore_paths = set(ignore_paths)
+        self.semiliterate_config = semiliterate
         self.semiliterate = []
         for item in semiliterate:
             self.semiliterate.append(Semiliterate(**item))
-        self.ignore_patterns: Dict[pathlib.Path, List[str]] = {}
+        self.semiliterate_dispatch = SemiliterateDispatch(self.semiliterate)
+        self.cache = None
+        if cache_dir:
+            self.cache = ExtractionCache(
+                cache_dir,
+                get_fingerprint(semiliterate),
+                cache_size * 1024 * 1024)
+        self.text_sample_size = text_sample_size
+        self.max_file_size = max_file_size
+        self.strict_text_check = strict_text_check
+        self.extract_engine = extract_engine
+        self.mmap_threshold = mmap_threshold
+        self.workers = workers
+        self.copy_threads = copy_threads
+        self.copy_pool: CopyPool = None
+        self.link_mode = link_mode
+        self.persist_manifest = persist_manifest
+        self._text_files: Dict[tuple, bool] = {}
+        self.skipped_files = 0
+        self.manifest: BuildManifest = None
+        self.ignore_patterns: Dict[str, IgnoreMatcher] = {}
         self.root_path: pathlib.Path = pathlib.Path()
+        self._ignore_matcher: IgnoreMatcher = None
+        self._processed_ignore_glob: set = None
+        self._ignore_path_index: PathPrefixIndex = None
+        self._ignore_scopes: Dict[str, tuple] = {}
+        self._ignored_directories: Dict[str, bool] = {}
+        # Directories the files were found in, and ignored directories that
+        # weren't searched, from the last time files were found
+        self.kept_directories: set = set()
+        self.pruned_directories: set = set()
+
+    @property
+    def ignore_matcher(self) -> IgnoreMatcher:
+        """Returns the compiled matcher for the ignore globs."""
+        if self._ignore_matcher is None:
+            self._ignore_matcher = IgnoreMatcher(self.ignore_glob)
+        return self._ignore_matcher
+
+    @property
+    def ignore_path_index(self) -> PathPrefixIndex:
+        """Returns the index of the ignored absolute paths.
 
-    def process_mkdocsignore_files(self):
-        """Process all .mkdocsignore files and update ignore_glob."""
-        for mkdocsignore in self.root_path.rglob('.mkdocsignore'):
-            relative_path = mkdocsignore.parent.relative_to(self.root_path)
+        Each path is indexed both as given and with symlinks resolved.
+        """
+        if self._ignore_path_index is None:
+            paths = set()
+            for path in self.ignore_paths:
+                paths.add(os.path.abspath(path))
+                paths.add(os.path.realpath(path))
+            self._ignore_path_index = PathPrefixIndex(paths)
+        return self._ignore_path_index
+
+    def load_mkdocsignore(self, directory: str) -> IgnoreMatcher:
+        """Load the .mkdocsignore rules of a directory.
+
+        Rules are relative to the directory of the .mkdocsignore file, and only
+        apply to that directory and below.
+
+        Returns:
+            The matcher for the rules, or None if there is no .mkdocsignore.
+        """
+        if directory in self.ignore_patterns:
+            return self.ignore_patterns[directory]
+        mkdocsignore = os.path.join(directory, '.mkdocsignore')
+        matcher = None
+        if os.path.isfile(mkdocsignore):
             patterns = []
-            with mkdocsignore.open(mode="r", encoding="utf-8") as txt_file:
+            with open(mkdocsignore, mode="r", encoding="utf-8") as txt_file:
                 for line in txt_file:
                     line = line.strip()
                     if line and not line.startswith('#'):
                         patterns.append(line)
-
             if not patterns:
                 # If .mkdocsignore is empty, ignore everything in this directory
                 # and below
-                pattern = str(relative_path / '**')
-                self.ignore_glob.add(pattern)
+                patterns = ['**']
+            patterns.extend([f"{pattern}/**" for pattern in patterns])
+            matcher = IgnoreMatcher(patterns)
+        self.ignore_patterns[directory] = matcher
+        return matcher
+
+    def get_ignore_scopes(self, directory: str) -> tuple:
+        """Get the ignore rules that apply to the contents of a directory.
+
+        The rules are the ignore globs plus the .mkdocsignore of the directory
+        and each of its parents, loaded the first time they are needed.
+
+        Returns:
+            A tuple of (prefix, matcher) pairs, where the matcher applies to
+            the part of a path that comes after the prefix.
+        """
+        directory = os.path.normpath(directory)
+        scopes = self._ignore_scopes.get(directory)
+        if scopes is None:
+            if directory == os.curdir:
+                scopes = (("", self.ignore_matcher),)
+                prefix = ""
             else:
-                for pattern in patterns:
-                    if relative_path != pathlib.Path('.'):
-                        pattern = str(relative_path / pattern)
-                    self.ignore_glob.add(pattern)
+                scopes = self.get_ignore_scopes(
+                    os.path.dirname(directory) or os.curdir)
+                prefix = directory + os.sep
+            matcher = self.load_mkdocsignore(directory)
+            if matcher:
+                scopes += ((prefix, matcher),)
+            self._ignore_scopes[directory] = scopes
+        return scopes
 
     def process_ignore_folders(self):
-        """Update ignore glob to include folders."""
-        self.ignore_glob.update(
-            [f"{pattern}/**" for pattern in self.ignore_glob])
+        """Update ignore glob to include folders.
+
+        The globs are only updated once, so the compiled matcher is kept when
+        files are found again with the same instance.
+        """
+        if self.ignore_glob != self._processed_ignore_glob:
+            self.ignore_glob.update(
+                [f"{pattern}/**" for pattern in self.ignore_glob])
+            self._processed_ignore_glob = set(self.ignore_glob)
+            self._ignore_matcher = None
+        self._ignore_scopes = {}
+        self._ignored_directories = {}
 
     def get_files(self) -> List[str]:
-        """Get a list of files to process, excluding ignored files."""
-        # Process all .mkdocsignore files first
-        self.process_mkdocsignore_files()
+        """Get a sorted list of files to process, excluding ignored files.
+
+        The files are sorted so sources with the same output are built in the
+        same order in every build.
+        """
+        # Reload .mkdocsignore files as they are found
+        self.ignore_patterns = {}
+        self._ignore_path_index = None
         self.process_ignore_folders()  # TODO[athackst] deprecate
+        self.pruned_directories = set()
+        self.kept_directories = set()
         files = set()
+        visited = set()
         for pattern in self.folders:
             for entry in pathlib.Path().glob(pattern):
                 if entry.is_dir():
-                    files.update(str(f) for f in entry.rglob(
-                        '*') if self.is_valid_file(f))
+                    # A directory that is ignored has all of its contents
+                    # ignored as well, so don't walk it at all.
+                    if not self.is_ignored_directory(entry):
+                        files.update(self.walk(str(entry), visited))
+                    else:
+                        self.pruned_directories.add(str(entry))
                 elif self.is_valid_file(entry):
                     files.add(str(entry))
-        return list(files)
+                    self.kept_directories.add(
+                        os.path.dirname(str(entry)) or os.curdir)
+        self.kept_directories.update(visited)
+        return sorted(files)
+
+    def walk(self, directory: str, visited: set = None) -> Iterator[str]:
+        """Yield the files below a directory that are not ignored.
+
+        Ignore rules are checked on each subdirectory before it is entered, so
+        ignored subtrees are never scanned. Symlinked subdirectories are not
+        followed.
+
+        Args:
+            directory (str): The directory to walk
+            visited (set): Directories already walked, updated in place
+
+        """
+        if visited is None:
+            visited = set()
+        stack = [(os.path.normpath(directory), os.path.realpath(directory))]
+        while stack:
+            current, real_current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            for path, real_path, is_dir in self._scan_directory(
+                    current, real_current):
+                if is_dir:
+                    stack.append((path, real_path))
+                else:
+                    yield path
+
+    def _scan_directory(self, directory: str, real_directory: str) -> list:
+        """List the entries of a directory that aren't ignored.
+
+        Only files and real (not symlinked) directories are listed. The real
+        path of an entry is built from the real path of the directory, so
+        symlinks are only resolved for entries that are symlinks.
+
+        Returns:
+            A list of (path, real_path, is_dir) entries
+        """
+        try:
+            with os.scandir(directory) as iterator:
+                entries = list(iterator)
+        except OSError:
+            return []
+        if not any(entry.name == '.mkdocsignore' for entry in entries):
+            # Nothing to load, skip looking for it
+            self.ignore_patterns.setdefault(directory, None)
+        scopes = self.get_ignore_scopes(directory)
+        result = []
+        for entry in entries:
+            is_dir, is_file = _get_entry_type(entry)
+            if not is_dir and not is_file:
+                continue
+            path = entry.name if directory == os.curdir else entry.path
+            if not is_dir and entry.is_symlink():
+                real_path = os.path.realpath(path)
+            else:
+                real_path = os.path.join(real_directory, entry.name)
+            if is_dir:
+                if not self._is_ignored_directory(path, real_path, scopes):
+                    result.append((path, real_path, True))
+                else:
+                    self.pruned_directories.add(path)
+            elif not self._is_ignored(path, real_path, scopes):
+                result.append((path, real_path, False))
+        return result
 
     def is_valid_file(self, path: pathlib.Path) -> bool:
         """Check if file is valid (not ignored and matches doc_glob)."""
@@ -114,15 +538,56 @@ class Simple():
     def is_ignored(self, path: pathlib.Path) -> bool:
         """Check if path should be ignored."""
         rel_path = path.relative_to(self.root_path)
+        scopes = self.get_ignore_scopes(str(rel_path.parent))
+        return self._is_ignored(
+            str(rel_path), os.path.realpath(path), scopes)
+
+    def is_watched(self, path: str) -> bool:
+        """Check if a change to a path could change the docs.
+
+        Paths outside of the root path or that are ignored are not watched,
+        except for .mkdocsignore files, since their rules may ignore the file
+        itself and a change can still change which files are ignored.
+        """
+        rel_path = os.path.relpath(os.path.abspath(path))
+        if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+            return False
+        if os.path.basename(rel_path) == ".mkdocsignore":
+            return True
+        return not self.is_ignored(pathlib.Path(rel_path))
+
+    def is_ignored_directory(self, path: pathlib.Path) -> bool:
+        """Check if directory should be ignored, memoizing the result."""
+        rel_path = path.relative_to(self.root_path)
+        scopes = self.get_ignore_scopes(str(rel_path.parent))
+        return self._is_ignored_directory(
+            str(rel_path), os.path.realpath(path), scopes)
 
+    def _is_ignored(self, rel_path: str, real_path: str, scopes: tuple) -> bool:
+        """Check if a path should be ignored.
+
+        Args:
+            rel_path (str): The path relative to the root path
+            real_path (str): The absolute path with symlinks resolved
+            scopes (tuple): The ignore scopes of the path's directory
+
+        """
         # Check ignore_paths (absolute paths)
-        if any(path.resolve().is_relative_to(ignored)
-               for ignored in self.ignore_paths):
+        if self.ignore_path_index.contains(real_path):
             return True
 
-        # Check all ignore patterns
-        return any(fnmatch.fnmatch(str(rel_path), pattern)
-                   for pattern in self.ignore_glob)
+        # Check all ignore patterns that apply to the path
+        return any(matcher.match(rel_path[len(prefix):])
+                   for prefix, matcher in scopes)
+
+    def _is_ignored_directory(
+            self, rel_path: str, real_path: str, scopes: tuple) -> bool:
+        """Check if a directory should be ignored, memoizing the result."""
+        ignored = self._ignored_directories.get(rel_path)
+        if ignored is None:
+            ignored = self._is_ignored(rel_path, real_path, scopes)
+            self._ignored_directories[rel_path] = ignored
+        return ignored
 
     def is_doc_file(self, name: str) -> bool:
         """Check if file is a desired doc file."""
@@ -133,6 +598,15 @@ class Simple():
 
     def should_extract_file(self, name: str):
         """Check if file should be extracted."""
+        # Check if file is text based
+        if not self.is_text_file(name):
+            return False
+
+        # Check if file is hidden and should ignore
+        return not self.is_hidden_file(name)
+
+    def is_hidden_file(self, name: str) -> bool:
+        """Check if file is hidden and should be ignored."""
         def has_hidden_attribute(filepath):
             """Returns true if hidden attribute is set."""
             try:
@@ -151,17 +625,118 @@ class Simple():
                 return any(name.startswith(pattern)
                            for pattern in self.hidden_prefix)
             return any(hidden_prefix(part) for part in parts)
-        # Check if file is text based
+
+        if not self.ignore_hidden:
+            return False
+        return has_hidden_prefix(name) or has_hidden_attribute(name)
+
+    def _get_text_key(self, name: str) -> tuple:
+        """Returns the key for the text verdict of a file.
+
+        Returns:
+            The key, None if the verdict can't be cached, or False if the file
+            can't be extracted.
+        """
         try:
-            with open(name, 'r', encoding='utf-8') as f:
-                _ = f.read()
+            file_stat = os.stat(name)
+        except OSError:
+            return False
+        if self.max_file_size and file_stat.st_size > self.max_file_size:
+            return False
+        if not file_stat.st_ino:
+            return None
+        return (file_stat.st_dev, file_stat.st_ino,
+                file_stat.st_size, file_stat.st_mtime_ns)
+
+    def is_text_file(self, name: str) -> bool:
+        """Check if file is text based, and not too large to extract.
+
+        Verdicts are cached by the inode, size and modification time of the
+        file.
+        """
+        key = self._get_text_key(name)
+        if key is False:
+            return False
+        verdict = self._text_files.get(key)
+        if verdict is None:
+            verdict = self._check_text(name)
+            if key:
+                self._text_files[key] = verdict
+        return verdict
+
+    def is_large_file(self, name: str) -> bool:
+        """Check if a file should be extracted from a memory map."""
+        if not self.mmap_threshold:
+            return False
+        try:
+            return os.stat(name).st_size >= self.mmap_threshold
+        except OSError:
+            return False
+
+    def read_text_file(self, name: str) -> bytes:
+        """Read a file, if it is text based and not too large to extract.
+
+        The file is only opened once. Unless strict_text_check is set, a
+        sample from its start is checked before the rest is read, so binary
+        files aren't read in full.
+
+        Returns:
+            The content of the file, or None if it isn't text.
+        """
+        key = self._get_text_key(name)
+        if key is False:
+            return None
+        verdict = self._text_files.get(key)
+        if verdict is False:
+            return None
+        try:
+            with open(name, 'rb') as f:
+                sample = f.read(self.text_sample_size)
+                if verdict is None and not self.strict_text_check:
+                    verdict = self._is_text_sample(
+                        sample, len(sample) < self.text_sample_size)
+                    if key:
+                        self._text_files[key] = verdict
+                    if not verdict:
+                        return None
+                return sample + f.read()
+        except OSError:
+            return None
+
+    def _check_text(self, name: str) -> bool:
+        """Check if the file content is text.
+
+        Only a sample from the start of the file is checked, unless
+        strict_text_check is set, in which case the whole file must be valid
+        UTF-8.
+        """
+        try:
+            with open(name, 'rb') as f:
+                if self.strict_text_check:
+                    decoder = codecs.getincrementaldecoder('utf-8')()
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        decoder.decode(chunk)
+                    decoder.decode(b'', final=True)
+                    return True
+                sample = f.read(self.text_sample_size)
         except UnicodeDecodeError:
             return False
+        except OSError:
+            return False
+        return self._is_text_sample(
+            sample, len(sample) < self.text_sample_size)
 
-        # Check if file is hidden and should ignore
-        if self.ignore_hidden:
-            is_hidden = has_hidden_prefix(name) or has_hidden_attribute(name)
-            return not is_hidden
+    @staticmethod
+    def _is_text_sample(sample: bytes, is_complete: bool) -> bool:
+        """Check a sample has no NUL bytes and is valid UTF-8."""
+        if b'\0' in sample:
+            return False
+        try:
+            # The sample may end part way through a multi-byte character
+            codecs.getincrementaldecoder('utf-8')().decode(
+                sample, final=is_complete)
+        except UnicodeDecodeError:
+            return False
         return True
 
     def merge_docs(self, from_dir, dirty=False):
@@ -181,74 +756,424 @@ class Simple():
                             destination_file).st_mtime:
                         continue
                     os.remove(destination_file)
-                copy(source_file, destination_directory)
+                link_file(source_file, destination_file, self.link_mode)
                 utils.log.info(
                     "mkdocs-simple-plugin: %s/* --> %s/*",
                     source_file, destination_file)
         self.ignore_paths.add(from_dir)
+        self._ignore_path_index = None
 
-    def build_docs(
-            self,
-            dirty=False,
-            last_build_time=None,
-            do_copy=False) -> list:
-        """Build the docs directory from workspace files."""
+    def get_fingerprint(self, do_copy: bool = False) -> str:
+        """Returns a hash of the settings that affect the build outputs."""
+        return get_fingerprint({
+            "build_dir": self.build_dir,
+            "include": sorted(self.doc_glob),
+            "ignore_hidden": self.ignore_hidden,
+            "semiliterate": self.semiliterate_config,
+            "text_sample_size": self.text_sample_size,
+            "max_file_size": self.max_file_size,
+            "strict_text_check": self.strict_text_check,
+            "copy": do_copy,
+            "link_mode": self.link_mode,
+        })
+
+    def build_docs(self, dirty=False, do_copy=False) -> list:
+        """Build the docs directory from workspace files.
+
+        The outputs of each source are recorded in a manifest of the build
+        directory. In a dirty build, sources that are unchanged since the
+        manifest was saved are not processed again; their previous outputs are
+        returned instead. Sources that are unchanged since an earlier build
+        with this instance are never processed again.
+        """
         paths = []
-        files = self.get_files()
-        for file in files:
-            if not os.path.isfile(file):
+        self.skipped_files = 0
+        if self._load_manifest(do_copy):
+            dirty = True
+        manifest = self.manifest
+        sources = []
+        for file in self.get_files():
+            try:
+                file_stat = os.stat(file)
+            except OSError:
                 continue
-            if dirty and last_build_time and (
-                    os.path.getmtime(file) <= last_build_time):
+            if not stat.S_ISREG(file_stat.st_mode):
                 continue
-            from_dir = os.path.dirname(file)
-            name = os.path.basename(file)
-            build_prefix = os.path.normpath(
-                os.path.join(self.build_dir, from_dir))
-
-            doc_paths = self.get_doc_file(
-                from_dir, name, build_prefix, do_copy)
-            if doc_paths:
-                paths.append(
+            outputs = manifest.get_outputs(file, file_stat) if dirty else None
+            sources.append((file, file_stat, outputs))
+        built = self.build_files(
+            [file for file, _, outputs in sources if outputs is None], do_copy)
+        for file, file_stat, outputs in sources:
+            if outputs is not None:
+                file_paths = [
                     SimplePath(
-                        output_root=".",
-                        output_relpath=os.path.relpath(path=file, start="."),
+                        output_root=output_root,
+                        output_relpath=output_relpath,
                         input_path=file)
-                )
-                utils.log.info("mkdocs-simple-plugin: Added %s", file)
+                    for output_root, output_relpath in outputs]
+            else:
+                file_paths = built[file]
+            manifest.add(
+                file, file_stat,
+                [(path.output_root, path.output_relpath)
+                 for path in file_paths])
+            paths.extend(file_paths)
+        self._save_manifest(paths, do_copy)
+        if self.cache:
+            self.cache.prune()
+        if self.skipped_files:
+            utils.log.info(
+                "mkdocs-simple-plugin: Skipped %d files without extractions",
+                self.skipped_files)
+        return paths
+
+    def build_changed(
+            self,
+            previous: BuildManifest,
+            paths: list,
+            changed: Iterable[str],
+            do_copy=False) -> list:
+        """Build only the sources that changed since a previous build.
+
+        The outputs of unchanged sources are reused from the previous build,
+        without finding the files to process again.
+
+        Args:
+            previous (BuildManifest): The manifest of the previous build
+            paths (list): The paths returned by the previous build
+            changed (Iterable[str]): The paths that changed since then
+            do_copy (bool): Whether to copy files to the build dir
+
+        Returns:
+            The paths of the build, or None if the changes can't be built
+            without a full build, such as for a new source, a change to a
+            .mkdocsignore file or a missing output of an unchanged source.
+        """
+        fingerprint = self.get_fingerprint(do_copy)
+        if previous is None or previous.fingerprint != fingerprint:
+            return None
+        sources = self._get_changed_sources(previous, changed)
+        if sources is None:
+            return None
+        paths = [path for path in paths if path.input_path not in sources]
+        for path in paths:
+            if not os.path.exists(
+                    os.path.join(path.output_root, path.output_relpath)):
+                return None
+        self.skipped_files = 0
+        self.manifest = BuildManifest(self.build_dir, fingerprint)
+        self.manifest.load_from(previous)
+        self.manifest.keep_previous()
+        rebuild = []
+        for source in sorted(sources):
+            self._remove_from_manifest(source, do_copy)
+            try:
+                file_stat = os.stat(source)
+            except OSError:
                 continue
+            if stat.S_ISREG(file_stat.st_mode):
+                rebuild.append((source, file_stat))
+        built = self.build_files([source for source, _ in rebuild], do_copy)
+        for source, file_stat in rebuild:
+            self.manifest.add(
+                source, file_stat,
+                [(path.output_root, path.output_relpath)
+                 for path in built[source]])
+            paths.extend(built[source])
+        self._save_manifest(
+            [path for source, _ in rebuild for path in built[source]], do_copy)
+        return paths
 
-            extracted_paths = self.try_extract(from_dir, name, build_prefix)
-            for path in extracted_paths:
-                paths.append(
-                    SimplePath(
-                        output_root=self.build_dir,
-                        output_relpath=os.path.relpath(
-                            path=path,
-                            start=self.build_dir),
-                        input_path=file))
-                utils.log.info(
-                    "mkdocs-simple-plugin: Added %s->%s", file, path)
-            if extracted_paths:
+    @staticmethod
+    def _get_changed_sources(
+            previous: BuildManifest, changed: Iterable[str]) -> set:
+        """Get the sources of a previous build that changed.
+
+        Returns:
+            The changed sources, or None if a new source may have been added.
+        """
+        sources = set()
+        for path in changed:
+            path = os.path.relpath(path)
+            if os.path.basename(path) == ".mkdocsignore":
+                return None
+            if path in previous.entries:
+                sources.add(path)
+            elif os.path.isfile(path):
+                return None
+        return sources
+
+    def _remove_from_manifest(self, source: str, do_copy=False) -> None:
+        """Remove a source and the files written for it from the manifest."""
+        for output_root, output_relpath in self.manifest.remove(source):
+            written = self.get_written_path(SimplePath(
+                output_root=output_root,
+                output_relpath=output_relpath,
+                input_path=source), do_copy)
+            if written:
+                self.manifest.remove_written(written)
+
+    def _load_manifest(self, do_copy=False) -> bool:
+        """Load the manifest of the previous build.
+
+        The manifest of an earlier build with this instance is used if it had
+        the same settings. Otherwise it's read from the state directory, if
+        manifests are persisted.
+
+        Returns:
+            Whether the manifest of an earlier build with this instance was
+            used.
+        """
+        manifest = BuildManifest(self.build_dir, self.get_fingerprint(do_copy))
+        previous = self.manifest
+        self.manifest = manifest
+        if previous is not None and \
+                previous.fingerprint == manifest.fingerprint:
+            manifest.load_from(previous)
+            return True
+        if self.persist_manifest:
+            manifest.load()
+        return False
+
+    def _save_manifest(self, paths: list, do_copy=False) -> None:
+        """Record the files written to the build directory and save.
+
+        The manifest is only saved if it's persisted; otherwise it's only
+        used by later builds with this instance.
+        """
+        for path in paths:
+            written = self.get_written_path(path, do_copy)
+            if written:
+                self.manifest.add_written(written)
+        if self.persist_manifest:
+            self.manifest.save()
+
+    def get_written_path(self, path: SimplePath, do_copy=False) -> str:
+        """Returns the path written to the build directory for a path."""
+        if os.path.abspath(path.output_root) == os.path.abspath(self.build_dir):
+            return os.path.join(path.output_root, path.output_relpath)
+        if do_copy and path.output_root == ".":
+            return os.path.normpath(
+                os.path.join(self.build_dir, path.output_relpath))
+        return None
+
+    def remove_stale_outputs(self) -> List[str]:
+        """Remove the outputs of the previous build that weren't built again.
+
+        Only outputs that haven't changed since the previous build wrote them
+        are removed, along with any directories they leave empty.
+
+        Returns:
+            The paths removed.
+        """
+        if not self.manifest:
+            return []
+        build_dir = os.path.abspath(self.build_dir)
+        removed = []
+        for path in self.manifest.get_stale():
+            try:
+                os.remove(path)
+            except OSError:
                 continue
+            utils.log.info("mkdocs-simple-plugin: Removed stale %s", path)
+            removed.append(path)
+            directory = os.path.dirname(os.path.abspath(path))
+            while directory.startswith(build_dir + os.sep):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+        return removed
+
+    def build_files(
+            self,
+            files: List[str],
+            do_copy=False) -> Dict[str, List[SimplePath]]:
+        """Build the docs from workspace files, in worker processes if set.
 
+        Files in the same directory are built by the same worker in order, so
+        files that extract to the same output overwrite it in the same order
+        as when they are built one at a time.
+
+        Returns:
+            The paths built from each file.
+        """
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(files) <= 1:
+            return self._build_files_in_order(files, do_copy)
+        batches = {}
+        for file in files:
+            batches.setdefault(os.path.dirname(file), []).append(file)
+        built = {}
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self,)) as executor:
+            for batch_paths, skipped_files in executor.map(
+                    _build_batch,
+                    batches.values(),
+                    itertools.repeat(do_copy),
+                    chunksize=max(1, len(batches) // (workers * 4))):
+                built.update(batch_paths)
+                self.skipped_files += skipped_files
+        return built
+
+    def _build_files_in_order(
+            self,
+            files: List[str],
+            do_copy=False) -> Dict[str, List[SimplePath]]:
+        """Build the docs from workspace files, copying files in the background.
+
+        Errors copying files are reported once all the files are built.
+        """
+        if do_copy and self.copy_threads > 0:
+            self.copy_pool = CopyPool(
+                self.copy_threads,
+                max_pending=4 * self.copy_threads,
+                link_mode=self.link_mode)
+        try:
+            return {file: self.build_file(file, do_copy) for file in files}
+        finally:
+            if self.copy_pool:
+                for source, error in self.copy_pool.close():
+                    utils.log.error(
+                        "mkdocs-simple-plugin: could not copy %s\n %s",
+                        source, str(error))
+                self.copy_pool = None
+
+    def build_file(self, file: str, do_copy=False) -> List[SimplePath]:
+        """Build the docs from a workspace file."""
+        from_dir = os.path.dirname(file)
+        name = os.path.basename(file)
+        build_prefix = os.path.normpath(
+            os.path.join(self.build_dir, from_dir))
+
+        doc_paths = self.get_doc_file(
+            from_dir, name, build_prefix, do_copy)
+        if doc_paths:
+            utils.log.info("mkdocs-simple-plugin: Added %s", file)
+            return [
+                SimplePath(
+                    output_root=".",
+                    output_relpath=os.path.relpath(path=file, start="."),
+                    input_path=file)
+            ]
+
+        paths = []
+        extracted_paths = self.try_extract(from_dir, name, build_prefix)
+        if self.copy_pool and self.copy_pool.wait(extracted_paths):
+            # A file queued to be copied before this one has the same path,
+            # so extract again to overwrite it as a serial build would.
+            extracted_paths = self.try_extract(from_dir, name, build_prefix)
+        for path in extracted_paths:
+            paths.append(
+                SimplePath(
+                    output_root=self.build_dir,
+                    output_relpath=os.path.relpath(
+                        path=path,
+                        start=self.build_dir),
+                    input_path=file))
+            utils.log.info(
+                "mkdocs-simple-plugin: Added %s->%s", file, path)
         return paths
 
     def try_extract(self, from_dir: str, name: str, to_dir: str) -> list:
         """Extract content from file into destination.
 
+        The file is read and decoded once, and the content is shared by the
+        text check, the cache and every semiliterate extraction. Files larger
+        than mmap_threshold are not read; they are extracted from a memory
+        map instead.
+
         Returns the name of the file extracted if extractable.
         """
+        # Check if any semiliterate pattern matches
+        candidates = self.semiliterate_dispatch.get_candidates(name)
+        if not candidates:
+            return []
         # Check if it's hidden
         path = os.path.join(from_dir, name)
-        if not self.should_extract_file(path):
+        if self.is_hidden_file(path):
             return []
-        for item in self.semiliterate:
-            paths = item.try_extraction(from_dir, name, to_dir)
-            if paths:
+        data = None
+        if self.is_large_file(path):
+            if not self.is_text_file(path):
+                return []
+        else:
+            data = self.read_text_file(path)
+            if data is None:
+                return []
+        key = None
+        if self.cache:
+            key = self.cache.get_key(path, data)
+            paths = self.cache.get(key, to_dir)
+            if paths is not None:
                 return paths
+        if data is None:
+            paths = self._extract_file(candidates, from_dir, name, to_dir)
+        else:
+            paths = self._extract_content(
+                candidates, from_dir, name, to_dir, data)
+        # Don't cache a failure to read or write a file as nothing to extract
+        if key and paths is not None:
+            self.cache.put(key, to_dir, paths)
+        return paths or []
 
-        return []
+    def _extract_content(
+            self,
+            candidates: list,
+            from_dir: str,
+            name: str,
+            to_dir: str,
+            data: bytes) -> list:
+        """Extract from file content with the first matching semiliterate."""
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            utils.log.debug(
+                "mkdocs-simple-plugin: Skipped  %s",
+                os.path.join(from_dir, name))
+            return []
+        candidates = [item for item in candidates if item.may_extract(text)]
+        if not candidates:
+            # None of the settings can extract anything from the content
+            self.skipped_files += 1
+            return []
+        return self._try_candidates(
+            candidates, from_dir, name, to_dir,
+            text=text, engine=self.extract_engine)
+
+    @staticmethod
+    def _extract_file(
+            candidates: list,
+            from_dir: str,
+            name: str,
+            to_dir: str) -> list:
+        """Extract from a memory map of the file with the first semiliterate."""
+        return Simple._try_candidates(
+            candidates, from_dir, name, to_dir, engine="mmap")
+
+    @staticmethod
+    def _try_candidates(
+            candidates: list,
+            from_dir: str,
+            name: str,
+            to_dir: str,
+            **kwargs) -> list:
+        """Extract with the first semiliterate that extracts anything.
+
+        Returns:
+            The files extracted, or None if nothing was extracted and reading
+            or writing a file failed.
+        """
+        failed = False
+        for item in candidates:
+            paths = item.try_extraction(from_dir, name, to_dir, **kwargs)
+            if paths:
+                return paths
+            failed = failed or paths is None
+        return None if failed else []
 
     def get_doc_file(
             self,
@@ -268,5 +1193,30 @@ class Simple():
         if do_copy:
             destination = os.path.join(to_dir, name)
             os.makedirs(to_dir, exist_ok=True)
-            copy(original, destination)
+            if self.copy_pool:
+                self.copy_pool.copy(original, destination)
+            else:
+                link_file(original, destination, self.link_mode)
         return [original]
+
+
+# The Simple instance of a worker process
+_worker_simple: Simple = None
+
+
+def _init_worker(simple: Simple) -> None:
+    """Set the Simple instance of a worker process."""
+    global _worker_simple  # pylint: disable=global-statement
+    _worker_simple = simple
+
+
+def _build_batch(files: List[str], do_copy: bool) -> tuple:
+    """Build workspace files in a worker process.
+
+    Returns:
+        A (paths, skipped_files) pair, where paths are the paths built from
+        each file and skipped_files is the number of files skipped.
+    """
+    _worker_simple.skipped_files = 0
+    paths = {file: _worker_simple.build_file(file, do_copy) for file in files}
+    return paths, _worker_simple.skipped_files
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Benchmark the extraction engines on a large generated source file.
+
+Usage:
+    python tests/benchmark_extract.py [number_of_lines]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from mkdocs_simple_plugin.plugin import SimplePlugin
+from mkdocs_simple_plugin.semiliterate import EXTRACT_ENGINES, Semiliterate
+
+
+def get_default_semiliterate() -> list:
+    """Returns the default semiliterate settings of the plugin."""
+    for name, option in SimplePlugin.config_scheme:
+        if name == "semiliterate":
+            return option.default
+    return []
+
+
+def get_source(lines: int) -> str:
+    """Returns a python source with a documentation block every 1000 lines."""
+    source = []
+    for number in range(lines):
+        if number % 1000 == 0:
+            source.append(f"# md\n# Documentation for block {number}\n# /md\n")
+        source.append(f"    value_{number} = compute(value, {number})\n")
+    return "".join(source)
+
+
+def read_outputs(paths: list) -> dict:
+    """Returns the content of each output file by name."""
+    outputs = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            outputs[os.path.basename(path)] = file.read()
+    return outputs
+
+
+def main(lines: int = 200000, number: int = 5):
+    """Time each engine and check they extract the same output."""
+    text = get_source(lines)
+    semiliterate = [
+        Semiliterate(**settings) for settings in get_default_semiliterate()]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "source.py"), "w",
+                  encoding="utf-8") as source:
+            source.write(text)
+        for engine in EXTRACT_ENGINES:
+            destination = os.path.join(directory, engine)
+            # The memory mapped engine reads the file itself
+            engine_text = None if engine == "mmap" else text
+
+            def extract(engine=engine, destination=destination,
+                        engine_text=engine_text):
+                for item in semiliterate:
+                    paths = item.try_extraction(
+                        directory, "source.py", destination,
+                        text=engine_text, engine=engine)
+                    if paths:
+                        return paths
+                return []
+
+            seconds = min(timeit.repeat(extract, number=1, repeat=number))
+            results[engine] = (seconds, read_outputs(extract()))
+            print(f"{engine:>8}: {seconds * 1000:.1f} ms for {lines} lines")
+    stream_seconds, stream_outputs = results["stream"]
+    for engine, (seconds, outputs) in results.items():
+        if outputs != stream_outputs:
+            print(f"{engine:>8}: output differs from stream")
+            return 1
+        print(f"{engine:>8}: {stream_seconds / seconds:.1f}x speedup")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:]]))
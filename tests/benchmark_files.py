@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Benchmark merging generated files into the files found by mkdocs.
+
+Usage:
+    python tests/benchmark_files.py [number_of_files]
+"""
+import sys
+import timeit
+
+from mkdocs.structure.files import File, Files
+
+from mkdocs_simple_plugin.plugin import reconcile_files
+
+
+def make_files(src_dir: str, count: int) -> list:
+    """Returns a list of markdown files in a source directory."""
+    return [
+        File(path=f"section_{number % 100}/page_{number}.md",
+             src_dir=src_dir, dest_dir="/site", use_directory_urls=True)
+        for number in range(count)]
+
+
+def main(count: int = 50000, number: int = 3):
+    """Time reconciling doubling numbers of files and check the scaling."""
+    results = []
+    size = count // 4
+    while size <= count:
+        existing = make_files("/docs", size)
+        generated = {file.src_uri: file for file in make_files("/build", size)}
+
+        def reconcile(existing=existing, generated=generated):
+            reconcile_files(Files(existing), generated, set(), "/docs/")
+
+        seconds = min(timeit.repeat(reconcile, number=1, repeat=number))
+        results.append((size, seconds))
+        print(f"{size:>8} files: {seconds * 1000:.1f} ms "
+              f"({seconds / size * 1e6:.2f} us per file)")
+        size *= 2
+    (first_size, first_seconds), (last_size, last_seconds) = \
+        results[0], results[-1]
+    ratio = (last_seconds / first_seconds) / (last_size / first_size)
+    print(f"time grows {ratio:.2f}x as fast as the number of files")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:]]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Test mkdocs_simple_plugin.cache"""
+import os
+import unittest
+
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+from mkdocs_simple_plugin.cache import ExtractionCache
+
+
+class TestExtractionCache(TestCase):
+    """Test ExtractionCache."""
+
+    def setUp(self) -> None:
+        """Set up a fake file system with a source and its output."""
+        self.setUpPyfakefs()
+        self.fs.create_file("src/module.py", contents="# md\n# Hello\n")
+        self.fs.create_file("/build/src/module.md", contents="Hello\n")
+        self.fs.create_file("/build/src/other.md", contents="World\n")
+        self.cache = ExtractionCache("/cache", "config", 1024)
+
+    def test_get_key(self):
+        """Test keys depend on the content, name and settings."""
+        key = self.cache.get_key("src/module.py")
+        self.assertEqual(key, self.cache.get_key("src/module.py"))
+
+        self.fs.create_file("other/module.py", contents="# md\n# Hello\n")
+        self.assertEqual(key, self.cache.get_key("other/module.py"))
+
+        self.fs.create_file("src/renamed.py", contents="# md\n# Hello\n")
+        self.assertNotEqual(key, self.cache.get_key("src/renamed.py"))
+
+        other_cache = ExtractionCache("/cache", "other", 1024)
+        self.assertNotEqual(key, other_cache.get_key("src/module.py"))
+
+        with open("src/module.py", "a") as file:
+            file.write("# More\n")
+        self.assertNotEqual(key, self.cache.get_key("src/module.py"))
+
+    def test_get_put(self):
+        """Test outputs are restored from the cache."""
+        key = self.cache.get_key("src/module.py")
+        self.assertIsNone(self.cache.get(key, "/build/src"))
+
+        self.cache.put(
+            key, "/build/src",
+            ["/build/src/module.md", "/build/src/other.md"])
+        self.assertEqual(
+            ["/site/src/module.md", "/site/src/other.md"],
+            self.cache.get(key, "/site/src"))
+        with open("/site/src/module.md") as file:
+            self.assertEqual("Hello\n", file.read())
+        with open("/site/src/other.md") as file:
+            self.assertEqual("World\n", file.read())
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_get_put_empty(self):
+        """Test sources without outputs are cached."""
+        key = self.cache.get_key("src/module.py")
+        self.cache.put(key, "/build/src", [])
+        self.assertEqual([], self.cache.get(key, "/build/src"))
+
+    def test_prune(self):
+        """Test the least recently used entries are removed."""
+        keys = []
+        for number in range(3):
+            key = f"{number:02}" + "0" * 62
+            self.cache.put(key, "/build/src", ["/build/src/module.md"])
+            entry_path = os.path.join("/cache", key[:2], key)
+            os.utime(entry_path, (number, number))
+            keys.append(key)
+        # Use the oldest entry
+        self.assertIsNotNone(self.cache.get(keys[0], "/build/src"))
+
+        # Each entry is 6 bytes for the output plus the index file
+        entry_size = 6 + len('["module.md"]')
+        self.cache.max_size = 2 * entry_size
+        self.cache.prune()
+        self.assertIsNotNone(self.cache.get(keys[0], "/build/src"))
+        self.assertIsNone(self.cache.get(keys[1], "/build/src"))
+        self.assertIsNotNone(self.cache.get(keys[2], "/build/src"))
+
+
+if __name__ == '__main__':
+    unittest.main()
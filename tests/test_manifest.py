@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""Test mkdocs_simple_plugin.manifest"""
+import os
+import unittest
+
+from pyfakefs.fake_filesystem_unittest import TestCase
+
+from mkdocs_simple_plugin.manifest import (
+    BuildManifest, get_fingerprint, make_private_directory)
+
+
+class TestBuildManifest(TestCase):
+    """Test BuildManifest."""
+
+    def setUp(self) -> None:
+        """Set up a fake file system with a source and its output."""
+        self.setUpPyfakefs()
+        self.fs.create_file("src/module.py", contents="# md\n# Hello\n")
+        self.fs.create_file("/build/src/module.md", contents="Hello\n")
+        self.outputs = [["/build", "src/module.md"]]
+
+    def save_manifest(self, fingerprint="config"):
+        """Save a manifest with the source and its output."""
+        manifest = BuildManifest("/build", fingerprint)
+        manifest.add("src/module.py", os.stat("src/module.py"), self.outputs)
+        manifest.save()
+        return manifest
+
+    def test_get_fingerprint(self):
+        """Test fingerprints are stable and change with the settings."""
+        self.assertEqual(
+            get_fingerprint({"a": 1, "b": [1, 2]}),
+            get_fingerprint({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(
+            get_fingerprint({"a": 1}), get_fingerprint({"a": 2}))
+
+    def test_unchanged(self):
+        """Test the outputs of an unchanged source are returned."""
+        self.save_manifest()
+        # The manifest isn't saved in the build directory
+        self.assertEqual(["src"], os.listdir("/build"))
+        self.assertTrue(os.path.exists(BuildManifest("/build", "").path))
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertEqual(
+            self.outputs,
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+        self.assertIsNone(
+            manifest.get_outputs("src/other.py", os.stat("src/module.py")))
+
+    def test_changed(self):
+        """Test changed sources have no outputs."""
+        self.save_manifest()
+        with open("src/module.py", "a") as file:
+            file.write("# more\n")
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertIsNone(
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+
+    def test_missing_output(self):
+        """Test sources with missing outputs have no outputs."""
+        self.save_manifest()
+        os.remove("/build/src/module.md")
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertIsNone(
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+
+    def test_different_fingerprint(self):
+        """Test a manifest saved with other settings is not used."""
+        self.save_manifest(fingerprint="other")
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertIsNone(
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+
+    def test_invalid_file(self):
+        """Test an invalid manifest file is ignored."""
+        self.fs.create_file(
+            BuildManifest("/build", "config").path, contents="{")
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertIsNone(
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+
+    def test_save_only_current_entries(self):
+        """Test sources that weren't added in this build are dropped."""
+        self.save_manifest()
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        manifest.save()
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertIsNone(
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+
+    def test_get_stale(self):
+        """Test files written before but not in this build are stale."""
+        self.fs.create_file("/build/src/old.md", contents="Old\n")
+        self.fs.create_file("/build/src/edited.md", contents="Edited\n")
+        manifest = self.save_manifest()
+        for path in ["src/module.md", "src/old.md", "src/edited.md"]:
+            manifest.add_written(os.path.join("/build", path))
+        manifest.save()
+        with open("/build/src/edited.md", "a") as file:
+            file.write("by hand\n")
+
+        manifest = BuildManifest("/build", "other")
+        manifest.load()
+        manifest.add_written("/build/src/module.md")
+        self.assertEqual(["/build/src/old.md"], manifest.get_stale())
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "needs user ids")
+    def test_make_private_directory(self):
+        """Test directories that may not belong to the user are rejected."""
+        make_private_directory("/state/manifests")
+        self.assertTrue(os.path.isdir("/state/manifests"))
+        make_private_directory("/state/manifests")
+
+        self.fs.create_symlink("/state/link", "/build")
+        with self.assertRaises(OSError):
+            make_private_directory("/state/link")
+        self.fs.create_dir("/state/other")
+        os.chown("/state/other", os.getuid() + 1, -1)
+        with self.assertRaises(OSError):
+            make_private_directory("/state/other")
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "needs user ids")
+    def test_unsafe_state_directory(self):
+        """Test a manifest isn't used from a directory of another user."""
+        self.save_manifest()
+        os.chown(os.path.dirname(BuildManifest("/build", "").path),
+                 os.getuid() + 1, -1)
+
+        manifest = BuildManifest("/build", "config")
+        manifest.load()
+        self.assertIsNone(
+            manifest.get_outputs("src/module.py", os.stat("src/module.py")))
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "needs user ids")
+    def test_save_to_unsafe_state_directory(self):
+        """Test failing to save a manifest isn't a warning."""
+        directory = os.path.dirname(BuildManifest("/build", "").path)
+        self.fs.create_dir(directory)
+        os.chown(directory, os.getuid() + 1, -1)
+
+        with self.assertLogs("mkdocs", level="DEBUG") as logs:
+            manifest = self.save_manifest()
+        self.assertEqual(
+            ["DEBUG"], [record.levelname for record in logs.records])
+        self.assertFalse(os.path.exists(manifest.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
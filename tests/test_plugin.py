@@ -2,26 +2,38 @@
 """Test mkdocs_simple_plugin.plugin."""
 import os
 from pathlib import Path
-import shutil
 import tempfile
 import unittest
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.livereload import LiveReloadServer
 from mkdocs.structure.files import File, Files
 
-from mkdocs_simple_plugin.plugin import SimplePlugin, get_config_site_dir
+from mkdocs_simple_plugin.plugin import (
+    DEFAULT_CONFIG_YAML, LazyString, SimplePlugin, get_config_site_dir,
+    get_default_config_yaml, get_project_build_dir, get_watch_directories,
+    reconcile_files)
 
 
 class TestSimplePlugin(unittest.TestCase):
     """Test SimplePlugin configuration."""
 
+    def setUp(self):
+        """Keep the plugin state out of the user's cache directory."""
+        state_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(state_directory.cleanup)
+        environ = patch.dict(os.environ, {
+            "XDG_CACHE_HOME": state_directory.name,
+            "LOCALAPPDATA": state_directory.name})
+        environ.start()
+        self.addCleanup(environ.stop)
+
     def make_plugin(self, config=None):
         """Create a configured plugin and clean up its temporary directory."""
         plugin = SimplePlugin()
-        self.addCleanup(
-            shutil.rmtree, plugin.tmp_build_dir, ignore_errors=True)
+        self.addCleanup(plugin.on_shutdown)
         errors, warnings = plugin.load_config(config or {})
         self.assertEqual([], errors)
         self.assertEqual([], warnings)
@@ -31,7 +43,7 @@ class TestSimplePlugin(unittest.TestCase):
         """Create a valid MkDocs configuration rooted in a test directory."""
         docs_dir = root / "docs"
         site_dir = root / "site"
-        docs_dir.mkdir()
+        docs_dir.mkdir(exist_ok=True)
 
         config = MkDocsConfig()
         config.load_dict({
@@ -90,11 +102,91 @@ class TestSimplePlugin(unittest.TestCase):
         self.assertEqual(plugin.tmp_build_dir, plugin.config["build_dir"])
         self.assertEqual(plugin.tmp_build_dir, config["docs_dir"])
 
+    def test_on_config_persists_manifest_for_later_builds(self):
+        """Test the manifest is only saved where later builds can use it."""
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        root = Path(temporary_directory.name)
+        cases = [
+            ({}, False, False),
+            ({}, True, True),
+            ({"build_dir": str(root / "build")}, False, True),
+        ]
+        for number, (settings, dirty, persist) in enumerate(cases):
+            with self.subTest(settings=settings, dirty=dirty):
+                plugin = self.make_plugin(settings)
+                plugin.on_startup(command="build", dirty=dirty)
+                project = root / str(number)
+                project.mkdir()
+                config = self.make_mkdocs_config(project)
+                with patch(
+                        "mkdocs_simple_plugin.plugin.get_config_site_dir",
+                        return_value=config["site_dir"]):
+                    plugin.on_config(config)
+                self.assertEqual(persist, plugin.persist_manifest)
+
+    def configure_project(self, plugin, project):
+        """Load the config of a project with its own mkdocs.yml."""
+        project.mkdir(exist_ok=True)
+        config = self.make_mkdocs_config(project)
+        config.config_file_path = str(project / "mkdocs.yml")
+        with patch(
+                "mkdocs_simple_plugin.plugin.get_config_site_dir",
+                return_value=config["site_dir"]):
+            plugin.on_config(config)
+        return plugin.config["build_dir"]
+
+    def test_project_build_directory_is_kept(self):
+        """Test the project build directory is kept for later processes."""
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        project = Path(temporary_directory.name) / "project"
+        plugin = self.make_plugin({"merge_docs_dir": False})
+        build_dir = self.configure_project(plugin, project)
+        self.assertEqual(
+            get_project_build_dir(str(project / "mkdocs.yml")), build_dir)
+        self.assertTrue(plugin.persist_manifest)
+        Path(build_dir, "index.md").write_text("Hello")
+
+        # Reloading the config keeps the directory and its outputs
+        plugin.load_config({"merge_docs_dir": False})
+        self.assertEqual(build_dir, self.configure_project(plugin, project))
+
+        # Other processes use a temporary directory while it's locked
+        other = self.make_plugin({"merge_docs_dir": False})
+        other_build_dir = self.configure_project(other, project)
+        self.assertNotEqual(build_dir, other_build_dir)
+        self.assertFalse(other.persist_manifest)
+        other.on_shutdown()
+        self.assertFalse(os.path.exists(other_build_dir))
+
+        plugin.on_shutdown()
+        self.assertIsNone(plugin.tmp_build_dir)
+        self.assertTrue(os.path.exists(os.path.join(build_dir, "index.md")))
+        later = self.make_plugin({"merge_docs_dir": False})
+        self.assertEqual(build_dir, self.configure_project(later, project))
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "needs user ids")
+    def test_unsafe_project_build_directory(self):
+        """Test a build directory of another user isn't used."""
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        project = Path(temporary_directory.name) / "project"
+        build_dir = get_project_build_dir(str(project / "mkdocs.yml"))
+        os.makedirs(build_dir)
+        os.chown(build_dir, os.getuid() + 1, -1)
+
+        plugin = self.make_plugin({"merge_docs_dir": False})
+        temporary_build_dir = self.configure_project(plugin, project)
+        self.assertNotEqual(build_dir, temporary_build_dir)
+        plugin.on_shutdown()
+        self.assertFalse(os.path.exists(temporary_build_dir))
+        self.assertTrue(os.path.isdir(build_dir))
+
     def test_on_files_replaces_existing_file_with_generated_file(self):
         """Test generated documentation replaces the original MkDocs file."""
         plugin = self.make_plugin()
         plugin.on_startup(command="serve", dirty=True)
-        plugin.last_build_time = 10
         temporary_directory = tempfile.TemporaryDirectory()
         self.addCleanup(temporary_directory.cleanup)
         root = Path(temporary_directory.name)
@@ -114,18 +206,16 @@ class TestSimplePlugin(unittest.TestCase):
         )
         files = Files([original])
 
-        with patch("mkdocs_simple_plugin.plugin.Simple") as simple_class, \
-                patch("mkdocs_simple_plugin.plugin.time.time",
-                      return_value=20):
+        with patch("mkdocs_simple_plugin.plugin.Simple") as simple_class:
             simple_class.return_value.build_docs.return_value = [
                 generated_path]
             result = plugin.on_files(files, config=config)
 
-        simple_class.assert_called_once_with(**plugin.config)
+        simple_class.assert_called_once_with(
+            **plugin.config, persist_manifest=False)
         simple_class.return_value.build_docs.assert_called_once_with(
-            True, 10, False)
+            True, False)
         self.assertIs(files, result)
-        self.assertEqual(20, plugin.last_build_time)
         self.assertEqual(1, len(files))
         generated = files.get_file_from_path("README.md")
         self.assertEqual("mkdocs_simple_plugin", generated.generated_by)
@@ -152,6 +242,51 @@ class TestSimplePlugin(unittest.TestCase):
 
         self.assertEqual(0, len(files))
 
+    def test_on_files_builds_changed_paths_when_serving(self):
+        """Test serve rebuilds only the paths changed since the last build."""
+        plugin = self.make_plugin()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        config = self.make_mkdocs_config(Path(temporary_directory.name))
+        plugin.changed_paths = set(["/project/changed.py"])
+        previous_paths = plugin.paths = []
+
+        with patch("mkdocs_simple_plugin.plugin.Simple") as simple_class:
+            simple = simple_class.return_value
+            previous_manifest = simple.manifest
+            simple.build_changed.return_value = []
+            plugin.on_files(Files([]), config=config)
+            simple.build_changed.assert_called_once_with(
+                previous_manifest, previous_paths,
+                set(["/project/changed.py"]), False)
+            simple.build_docs.assert_not_called()
+            self.assertEqual(set(), plugin.changed_paths)
+
+            # Fall back to a full build if the changes need it
+            simple.build_changed.return_value = None
+            simple.build_docs.return_value = []
+            plugin.on_files(Files([]), config=config)
+            simple.build_docs.assert_called_once_with(False, False)
+
+    def test_on_files_reuses_simple(self):
+        """Test the same Simple is used until the settings change."""
+        plugin = self.make_plugin()
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        config = self.make_mkdocs_config(Path(temporary_directory.name))
+
+        with patch("mkdocs_simple_plugin.plugin.Simple") as simple_class:
+            simple_class.return_value.build_docs.return_value = []
+            plugin.on_files(Files([]), config=config)
+            plugin.on_files(Files([]), config=config)
+            simple_class.assert_called_once_with(
+                **plugin.config, persist_manifest=False)
+            self.assertIs(simple_class.return_value, plugin.simple)
+
+            plugin.config["include"] = plugin.config["include"] + ["*.txt"]
+            plugin.on_files(Files([]), config=config)
+            self.assertEqual(2, simple_class.call_count)
+
     def test_on_serve_updates_watched_paths(self):
         """Test serve ignores generated files and watches their sources."""
         plugin = self.make_plugin({"build_dir": "/tmp/generated-docs"})
@@ -159,17 +294,108 @@ class TestSimplePlugin(unittest.TestCase):
             SimpleNamespace(input_path="README.md"),
             SimpleNamespace(input_path="docs/guide.md"),
         ]
+        plugin.simple = MagicMock()
+        plugin.simple.kept_directories = set([".", "docs"])
+        plugin.simple.pruned_directories = set([".git"])
+        plugin.simple.is_watched.side_effect = lambda path: \
+            path.endswith(".md")
         server = MagicMock()
         server._watched_paths = {plugin.config["build_dir"]: None}
+        server._want_rebuild = False
 
         result = plugin.on_serve(
             server, config=MagicMock(), builder=MagicMock())
 
         self.assertIs(server, result)
         server.unwatch.assert_called_once_with(plugin.config["build_dir"])
-        server.watch.assert_any_call("README.md")
-        server.watch.assert_any_call("docs/guide.md")
-        self.assertEqual(2, server.watch.call_count)
+        server.watch.assert_not_called()
+        # The root has an ignored directory, so it's not watched recursively
+        self.assertEqual(
+            [((os.getcwd(),), False),
+             ((os.path.join(os.getcwd(), "docs"),), True)],
+            [(call.args[1:], call.kwargs["recursive"])
+             for call in server.observer.schedule.call_args_list])
+        handler, path = server.observer.schedule.call_args_list[0].args
+        self.assertNotIn(path, server._watched_paths)
+
+        # Changes to ignored files don't trigger a rebuild
+        handler.on_any_event(SimpleNamespace(
+            is_directory=False, src_path="build/output.txt"))
+        self.assertFalse(server._want_rebuild)
+        handler.on_any_event(SimpleNamespace(
+            is_directory=False, src_path="docs/new.tmp",
+            dest_path="docs/new.md"))
+        self.assertTrue(server._want_rebuild)
+
+    def test_on_serve_watches_separately_from_server(self):
+        """Test directories also watched by mkdocs are still filtered."""
+        plugin = self.make_plugin()
+        plugin.paths = [SimpleNamespace(input_path="README.md")]
+        plugin.simple = MagicMock()
+        plugin.simple.kept_directories = set(["."])
+        plugin.simple.pruned_directories = set()
+        plugin.simple.is_watched.return_value = True
+        server = LiveReloadServer(
+            builder=MagicMock(), host="127.0.0.1", port=0,
+            root=os.getcwd())
+        self.addCleanup(server.server_close)
+        root = os.getcwd()
+        server.watch(root)
+
+        plugin.on_serve(server, config=MagicMock(), builder=MagicMock())
+        # The server's watch of the directory is left as it was
+        self.assertEqual(1, server._watched_paths[root])
+        [(handler, watch)] = plugin._watches
+        self.assertIn(handler, server.observer._handlers[watch])
+
+        handler.on_any_event(SimpleNamespace(
+            is_directory=False, src_path=os.path.join(root, "README.md")))
+        self.assertEqual(
+            set([os.path.join(root, "README.md")]), plugin.changed_paths)
+
+        plugin.on_shutdown()
+        self.assertNotIn(handler, server.observer._handlers[watch])
+        self.assertEqual(1, server._watched_paths[root])
+        server.unwatch(root)
+
+    def test_get_watch_directories(self):
+        """Test pruned directories are left out of recursive watches."""
+        self.assertEqual(
+            [("/a", False), ("/a/b", True), ("/a/b c", True),
+             ("/a/d", False), ("/a/d/f", True), ("/g", True)],
+            get_watch_directories(
+                ["/a", "/a/b", "/a/b/c", "/a/b/c/e", "/a/b c", "/a/d",
+                 "/a/d/f", "/g", "/g/h"],
+                ["/a/.git", "/a/d/e/node_modules"]))
+        self.assertEqual([], get_watch_directories([], ["/a/.git"]))
+
+    def test_reconcile_files(self):
+        """Test generated, stale and docs files are reconciled."""
+        def make_file(src_dir, path):
+            return File(path=path, src_dir=src_dir, dest_dir="/site",
+                        use_directory_urls=True)
+
+        files = Files([
+            make_file("/docs", "index.md"),
+            make_file("/docs", "stale.md"),
+            make_file("/docs2", "other.md"),
+            make_file("/build", "kept.md"),
+        ])
+        generated = make_file("/build", "index.md")
+
+        reconcile_files(
+            files, {"index.md": generated}, {"/docs/stale.md"})
+        self.assertEqual(
+            ["other.md", "kept.md", "index.md"],
+            [file.src_uri for file in files])
+        self.assertIs(generated, files.get_file_from_path("index.md"))
+
+        reconcile_files(files, {}, set(), docs_prefix="/docs/")
+        self.assertEqual(
+            ["other.md", "kept.md", "index.md"],
+            [file.src_uri for file in files])
+        reconcile_files(files, {}, set(), docs_prefix="/build/")
+        self.assertEqual(["other.md"], [file.src_uri for file in files])
 
     def test_get_config_site_dir_reads_original_configuration(self):
         """Test the configured site directory is resolved from mkdocs.yml."""
@@ -189,6 +415,63 @@ class TestSimplePlugin(unittest.TestCase):
 
         self.assertEqual(str(root / "output"), result)
 
+    def test_get_config_site_dir_env_and_inherit(self):
+        """Test site_dir is read through !ENV tags and INHERIT."""
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        root = Path(temporary_directory.name)
+        (root / "project" / "docs").mkdir(parents=True)
+        (root / "base.yml").write_text(
+            "site_name: Base\n"
+            "site_dir: !ENV [SIMPLE_TEST_SITE_DIR, 'default']\n"
+            "markdown_extensions:\n"
+            "  - pymdownx.emoji:\n"
+            "      emoji_index: !!python/name:unknown.module.index\n",
+            encoding="utf-8",
+        )
+        config_path = root / "project" / "mkdocs.yml"
+        config_path.write_text(
+            "INHERIT: ../base.yml\n"
+            "docs_dir: docs\n",
+            encoding="utf-8",
+        )
+
+        with patch.dict(os.environ, {"SIMPLE_TEST_SITE_DIR": "public"}):
+            result = get_config_site_dir(str(config_path))
+        self.assertEqual(str(root / "project" / "public"), result)
+
+        # The result is cached until one of the files changes
+        with patch("mkdocs_simple_plugin.plugin.yaml.load") as load:
+            self.assertEqual(result, get_config_site_dir(str(config_path)))
+        load.assert_not_called()
+        (root / "base.yml").write_text(
+            "site_dir: output\n", encoding="utf-8")
+        self.assertEqual(
+            str(root / "project" / "output"),
+            get_config_site_dir(str(config_path)))
+
+        config_path.write_text("site_name: Test\n", encoding="utf-8")
+        self.assertEqual(
+            str(root / "project" / "site"),
+            get_config_site_dir(str(config_path)))
+
+    def test_default_config_is_dumped_lazily(self):
+        """Test the default settings are only dumped when they are used."""
+        created = []
+
+        def create():
+            created.append(True)
+            return "include:\n- '*.md'\n"
+
+        lazy = LazyString(create=create)
+        self.assertEqual([], created)
+        self.assertEqual("include:\n- '*.md'\n", str(lazy))
+        self.assertIn("include:", lazy)
+        self.assertEqual(lazy + "", "include:\n- '*.md'\n")
+        self.assertEqual(1, len(created))
+
+        self.assertEqual(get_default_config_yaml(), str(DEFAULT_CONFIG_YAML))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,11 @@
 #!/usr/bin/env python
 """Test mkdocs_simple_plugin.semiliterate"""
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import os
 import re
-from io import TextIOWrapper
+import tempfile
+from io import StringIO, TextIOWrapper
 
 from pyfakefs import fake_filesystem_unittest
 
@@ -12,6 +13,7 @@ from mkdocs_simple_plugin.semiliterate import (
     ExtractionPattern,
     LazyFile,
     Semiliterate,
+    SemiliterateDispatch,
     StreamExtract,
 )
 
@@ -170,6 +172,35 @@ class TestLazyFile(FakeFsTestCase):
         self.assertEqual(output, self.full_path)
         self.assertContentsEqual(self.full_path, [''])
 
+    def test_write_unchanged(self):
+        """Test an output with the same content isn't written again."""
+        lazy_file = LazyFile(directory=self.directory, name=self.file)
+        lazy_file.write('test line')
+        lazy_file.close()
+        os.utime(self.full_path, (0, 0))
+
+        lazy_file.write('test line')
+        self.assertEqual(self.full_path, lazy_file.close())
+        self.assertEqual(0, os.stat(self.full_path).st_mtime)
+
+        lazy_file.write('changed line')
+        lazy_file.close()
+        self.assertNotEqual(0, os.stat(self.full_path).st_mtime)
+        self.assertContentsEqual(self.full_path, ['changed line'])
+        self.assertEqual([self.file], os.listdir(self.directory))
+
+    def test_write_creates_directory_once(self):
+        """Test the output directory is created once for many outputs."""
+        directory = os.path.join(self.directory, "new")
+        with patch("mkdocs_simple_plugin.semiliterate.os.makedirs",
+                   side_effect=os.makedirs) as makedirs:
+            for name in ["a.md", "b.md"]:
+                lazy_file = LazyFile(directory=directory, name=name)
+                lazy_file.write('line')
+                lazy_file.close()
+        makedirs.assert_called_once_with(directory, exist_ok=True)
+        self.assertEqual(["a.md", "b.md"], sorted(os.listdir(directory)))
+
     def test_same_path_should_be_equal(self):
         """Test that two LazyFiles are equal if they have the same path."""
         lazy_file = LazyFile(directory=self.directory, name=self.file)
@@ -369,6 +400,212 @@ class TestStreamExtract(FakeFsTestCase):
             [':Capture start', 'Content'])
 
 
+class TestStreamExtractStart(FakeFsTestCase):
+    """Test the combined start patterns find the same start as each pattern."""
+
+    starts = [
+        r'^\s*#+\W?md\b',
+        r'^\s*/\*+\W?(md)\b(.*)',
+        r'<!--\W?md\b',
+        r'^(a)|(b)',
+        r'\A(x)(?P<name>y)?',
+        r'^(c)\1',
+        r'(?i)^MD',
+        r'(d)(e)?$',
+        r'^',
+    ]
+
+    lines = [
+        "# md\n",
+        "/** md extra\n",
+        "  <!-- md -->\n",
+        "# md <!-- md\n",
+        "a\n",
+        "cb\n",
+        "xy\n",
+        "cc\n",
+        "md\n",
+        "d\n",
+        "de\n",
+        "STOP\n",
+        "plain text\n",
+    ]
+
+    def setUp(self):
+        """Set up the fake file system."""
+        self.setUpPyfakefs()
+
+    def extract(self, starts: list, directory: str) -> dict:
+        """Extract the lines with the start patterns and read the outputs."""
+        patterns = [
+            ExtractionPattern(start=start, stop=r'^STOP') for start in starts]
+        extract = StreamExtract(
+            input_stream=StringIO("".join(self.lines * 2)),
+            output_stream=LazyFile(directory, "output.md"),
+            patterns=patterns)
+        outputs = {}
+        for path in extract.extract():
+            with open(path) as file:
+                outputs[os.path.basename(path)] = file.read()
+        return outputs
+
+    def test_same_as_each_pattern(self):
+        """Test the same lines start extraction as searching in order."""
+        orders = [[first, second]
+                  for first in self.starts for second in self.starts]
+        orders += [self.starts, list(reversed(self.starts))]
+        for index, starts in enumerate(orders):
+            with self.subTest(starts=starts):
+                outputs = self.extract(starts, f"/combined/{index}")
+                with patch(
+                        "mkdocs_simple_plugin.semiliterate."
+                        "_combine_start_patterns",
+                        return_value=(None, frozenset())):
+                    expected = self.extract(starts, f"/expected/{index}")
+                self.assertEqual(expected, outputs)
+                self.assertTrue(outputs)
+
+
+class TestBlockExtract(FakeFsTestCase):
+    """Test BlockExtract extracts the same output as StreamExtract."""
+
+    settings = [
+        {
+            'pattern': r'.*',
+            'terminate': r'^\W*md-ignore',
+            'extract': [
+                {'start': r'^\s*"""\W?md\b', 'stop': r'^\s*"""\s*$'},
+                {
+                    'start': r'^\s*#+\W?md\b',
+                    'stop': r'^\s*#\s?\/md\s*$',
+                    'replace': [r'^\s*# ?(.*\n?)$', r'^.*$'],
+                },
+                {'start': r'^\s*/\*+\W?md\b', 'stop': r'^\s*\*\*/\s*$'},
+                {'start': r'<!--\W?(md)\b', 'stop': r'(-->)\s*$'},
+            ],
+        },
+        {'pattern': r'.*'},
+        {'pattern': r'.*', 'terminate': r'(END)', 'extract': {'stop': 'STOP'}},
+        {'pattern': r'.*', 'extract': {'start': r'(?i)md', 'stop': 'x$'}},
+        {'pattern': r'.*', 'terminate': 'E.D', 'extract': {'start': 'md'}},
+    ]
+
+    texts = [
+        "",
+        "no markers\n",
+        "code\n# md\n# Hello\n#  world\ncode\n# /md\ncode md\n",
+        'x = 1\n"""md\nDoc\n"""\n  """ md file=other.md\nOther\n"""\n',
+        "int x;\r\n/** md\r\n Doc\r\n**/\r\n/*md stop=END\r\nA\rEND\r",
+        "<p>\n<!-- md -->\n<!--md trim=2\n  Trimmed\n-->\n<!-- md",
+        "# md\nBlock md-ignore\n// md-ignore\n# md\nAfter\n",
+        "md-ignore\n# md\nAfter\n",
+        "First\nSTOP\nmd\nEND here\nLast",
+        "# md\n# md\n# /md\n# /md\n\n\n# md file=a.md\n# A\n# /md\n",
+        "MD\nx\nEND\nmd\nEND md\nENDmd\n",
+    ]
+
+    def setUp(self):
+        """Set up the fake file system."""
+        self.setUpPyfakefs()
+
+    def extract(self, settings: dict, text: str, directory: str,
+                engine: str) -> dict:
+        """Extract from the text and read the outputs."""
+        semiliterate = Semiliterate(**settings)
+        outputs = {}
+        for path in semiliterate.try_extraction(
+                "/source", "file.txt", directory, text=text, engine=engine):
+            with open(path, newline='') as file:
+                outputs[os.path.basename(path)] = file.read()
+        return outputs
+
+    def test_same_as_stream(self):
+        """Test the output is the same as StreamExtract."""
+        for index, settings in enumerate(self.settings):
+            for number, text in enumerate(self.texts):
+                with self.subTest(settings=settings, text=text):
+                    directory = f"/{index}/{number}"
+                    self.assertEqual(
+                        self.extract(
+                            settings, text, directory + "/stream", "stream"),
+                        self.extract(
+                            settings, text, directory + "/block", "block"))
+
+    def test_extract_file(self):
+        """Test extracting from a file."""
+        self.fs.create_file(
+            "/source/file.txt", contents=b"code\r\n# md\r\n# Hello\r\n")
+        semiliterate = Semiliterate(**self.settings[0])
+        self.assertEqual(
+            ["/output/file.md"],
+            semiliterate.try_extraction(
+                "/source", "file.txt", "/output", engine="block"))
+        with open("/output/file.md", newline='') as file:
+            self.assertEqual("Hello\n", file.read())
+
+
+class TestMmapExtract(unittest.TestCase):
+    """Test MmapExtract extracts the same output as StreamExtract."""
+
+    def setUp(self):
+        """Set up a temporary directory, since fake files can't be mapped."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.source = os.path.join(self.directory.name, "source")
+        os.makedirs(self.source)
+
+    def extract(self, settings: dict, data: bytes, directory: str,
+                engine: str) -> dict:
+        """Extract from a file with the data and read the outputs."""
+        with open(os.path.join(self.source, "file.txt"), "wb") as file:
+            file.write(data)
+        semiliterate = Semiliterate(**settings)
+        outputs = {}
+        for path in semiliterate.try_extraction(
+                self.source, "file.txt",
+                os.path.join(self.directory.name, directory), engine=engine):
+            with open(path, "rb") as file:
+                outputs[os.path.basename(path)] = file.read()
+        return outputs
+
+    def test_same_as_stream(self):
+        """Test the output is the same as StreamExtract."""
+        texts = TestBlockExtract.texts + ["é\r\n# md\r\n# €\r\n"]
+        for index, settings in enumerate(TestBlockExtract.settings):
+            for number, text in enumerate(texts):
+                with self.subTest(settings=settings, text=text):
+                    data = text.encode("utf-8")
+                    directory = f"{index}/{number}"
+                    self.assertEqual(
+                        self.extract(
+                            settings, data, directory + "/stream", "stream"),
+                        self.extract(
+                            settings, data, directory + "/mmap", "mmap"))
+
+    def test_invalid_text(self):
+        """Test nothing is extracted from lines that aren't valid UTF-8."""
+        settings = TestBlockExtract.settings[0]
+        self.assertEqual(
+            {"file.md": b"Hello\n"},
+            self.extract(
+                settings, b"\xff\n# md\n# Hello\n", "valid", "mmap"))
+        self.assertEqual(
+            {}, self.extract(
+                settings, b"# md\n# Hello\n#\xff\n", "invalid", "mmap"))
+        self.assertFalse(
+            os.path.exists(
+                os.path.join(self.directory.name, "invalid", "file.md")))
+
+        # Outputs of a previous build are left as they were
+        self.extract(settings, b"# md\n# Hello\n", "previous", "mmap")
+        self.assertEqual(
+            {}, self.extract(
+                settings, b"# md\n# Hello\n#\xff\n", "previous", "mmap"))
+        with open(os.path.join(
+                self.directory.name, "previous", "file.md"), "rb") as file:
+            self.assertEqual(b"Hello\n", file.read())
+
+
 class TestSemiliterate(FakeFsTestCase):
     """Test the Semiliterate base class."""
 
@@ -415,6 +652,21 @@ class TestSemiliterate(FakeFsTestCase):
         self.assertListEqual(result, [expected_output_path])
         self.assertTrue(self.fs.exists(expected_output_path))
 
+    def test_try_extraction_with_text(self):
+        """Test extraction from content that was already read."""
+        test_semiliterate = Semiliterate(pattern=r'.*\.txt')
+
+        # The file does not exist, only the text is used
+        result = test_semiliterate.try_extraction(
+            from_directory="/source",
+            from_file="example.txt",
+            destination_directory="/output",
+            text="Sample\r\ncontent\r\n"
+        )
+        self.assertListEqual(result, ["/output/example.md"])
+        self.assertContentsEqual(
+            "/output/example.md", ["Sample", "content"])
+
     def test_try_extraction_no_match(self):
         """Test extraction of a non matching file to an md file should fail."""
         test_semiliterate = Semiliterate(pattern=r'.*\.txt')
@@ -441,7 +693,8 @@ class TestSemiliterate(FakeFsTestCase):
             destination_directory='/output'
         )
         self.assertFalse(result)  # Extraction failed
-        self.assertListEqual(result, [])
+        # Failures are told apart from files with nothing to extract
+        self.assertIsNone(result)
 
     def test_unicode_filenames_and_content(self):
         """Test behavior with non-ASCII filenames and content."""
@@ -573,5 +826,155 @@ class TestSemiliterate(FakeFsTestCase):
         self.assertTrue(self.fs.exists(expected_output_path))
 
 
+class TestSemiliterateRequiredLiterals(unittest.TestCase):
+    """Test files are only skipped when no start pattern can match."""
+
+    starts = [
+        r'^\s*"""\W?md\b',
+        r'^\s*#+\W?md\b',
+        r'^\s*/\*+\W?md\b',
+        r'^\s*\/\/+\W?md\b',
+        r'<!--\W?md\b',
+        r'a(bc)+d',
+        r'ab*c',
+        r'x\ny',
+        r'x\r?$',
+        r'foo(?i:bar)',
+        r'(?i)md',
+        r'a|b',
+        r'^$',
+    ]
+
+    texts = [
+        "",
+        "no markers\n",
+        '    """md\n',
+        "## md\n",
+        "/** md\n",
+        "  //md\n",
+        "<!-- md -->\n",
+        "xabcbcd\n",
+        "ac\n",
+        "x\r\ny\n",
+        "x\ry\n",
+        "fooBAR\n",
+        "MD\n",
+        "b\n",
+        "\n\n",
+    ]
+
+    def test_default_literals(self):
+        """Test literals are derived from the default start patterns."""
+        semiliterate = Semiliterate(
+            pattern=r'.*',
+            extract=[{'start': start} for start in self.starts[:5]])
+        self.assertEqual(
+            ['"""', 'md', '/*', '//', '<!--'],
+            semiliterate.required_literals)
+        self.assertFalse(semiliterate.may_extract("def main():\n"))
+        self.assertTrue(semiliterate.may_extract("# md\n"))
+
+    def test_no_literals(self):
+        """Test every file is scanned if a pattern has no literal."""
+        self.assertIsNone(Semiliterate(pattern=r'.*').required_literals)
+        self.assertIsNone(Semiliterate(
+            pattern=r'.*',
+            extract=[{'start': 'md'}, {'stop': 'end'}]).required_literals)
+        self.assertIsNone(Semiliterate(
+            pattern=r'.*', extract={'start': '(?i)md'}).required_literals)
+
+    def test_skip_only_without_match(self):
+        """Test texts are only skipped if no line matches a start pattern."""
+        for start in self.starts:
+            semiliterate = Semiliterate(pattern=r'.*', extract={'start': start})
+            for text in self.texts:
+                with self.subTest(start=start, text=text):
+                    lines = StringIO(text, newline=None)
+                    if any(re.search(start, line) for line in lines):
+                        self.assertTrue(semiliterate.may_extract(text))
+
+
+class TestSemiliterateDispatch(unittest.TestCase):
+    """Test SemiliterateDispatch agrees with searching each pattern."""
+
+    patterns = [
+        r'^LICENSE$',
+        r'\.py$',
+        r'.*\.py$',
+        r'^.*\.c$',
+        r'py',
+        r'^test_',
+        r'(.*)\.txt$',
+        r'(?i)\.MD$',
+        r'(a)\1',
+        r'(b)\1',
+        r'a\\$',
+        r'\$',
+        r'\.tar\.gz$',
+        r'^$',
+        r'^.*$',
+        r'\.',
+        r'x\Z',
+        r'(?P<p0>y)',
+        r'.*',
+    ]
+
+    names = [
+        "LICENSE",
+        "LICENSE.md",
+        "a.py",
+        "test_a.py",
+        "py",
+        "main.c",
+        "a.txt",
+        "README.MD",
+        "readme.md",
+        "aa",
+        "bb",
+        "a\\",
+        "a$",
+        "x.tar.gz",
+        "",
+        "file\n",
+        "a.py\n",
+        "ax",
+        "y",
+    ]
+
+    def assertDispatchEqual(self, patterns):  # pylint: disable=invalid-name
+        """Assert dispatch gives the same candidates as searching in order."""
+        semiliterate = [Semiliterate(pattern=pattern) for pattern in patterns]
+        dispatch = SemiliterateDispatch(semiliterate)
+        for name in self.names:
+            with self.subTest(patterns=patterns, name=name):
+                self.assertEqual(
+                    [item for item in semiliterate
+                     if item.file_filter.search(name)],
+                    dispatch.get_candidates(name))
+
+    def test_single_patterns(self):
+        """Test each pattern on its own."""
+        for pattern in self.patterns:
+            self.assertDispatchEqual([pattern])
+
+    def test_combined_patterns(self):
+        """Test all patterns together, in both orders."""
+        self.assertDispatchEqual(self.patterns)
+        self.assertDispatchEqual(list(reversed(self.patterns)))
+
+    def test_destination(self):
+        """Test destination templates are expanded from the first match."""
+        semiliterate = [
+            Semiliterate(pattern=r'^LICENSE$'),
+            Semiliterate(pattern=r'(.*)\.py$', destination=r'\1_py.md'),
+            Semiliterate(pattern=r'.*'),
+        ]
+        dispatch = SemiliterateDispatch(semiliterate)
+        candidates = dispatch.get_candidates("module.py")
+        self.assertEqual(semiliterate[1:], candidates)
+        self.assertEqual(
+            "module_py.md", candidates[0].filename_match("module.py"))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 """Test mkdocs_simple_plugin.simple"""
+import errno
+import fnmatch
 import unittest
 from unittest.mock import patch
 import stat
 import os
 import shutil
+import tempfile
 
 from pyfakefs.fake_filesystem_unittest import TestCase
 
@@ -55,6 +58,48 @@ class TestSimple(TestCase):
         # Test text file
         self.assertTrue(simple_test.should_extract_file("example.md"))
 
+    def test_should_extract_file_sample(self):
+        """Test only a sample of the file is checked for text."""
+        simple_test = simple.Simple(**self.default_settings)
+        simple_test.text_sample_size = 8
+        # Binary content after the sample is not checked
+        self.fs.create_file("late.bin", contents=b'Hello_word\x80\xff')
+        self.assertTrue(simple_test.should_extract_file("late.bin"))
+        # NUL bytes in the sample are binary
+        self.fs.create_file("nul.bin", contents=b'Hel\x00lo_word')
+        self.assertFalse(simple_test.should_extract_file("nul.bin"))
+        # A character split by the end of the sample is still text
+        self.fs.create_file("split.md", contents="Hello_\u00e9_word")
+        self.assertTrue(simple_test.should_extract_file("split.md"))
+        # Strict check decodes the whole file
+        simple_test.strict_text_check = True
+        self.fs.create_file("strict.bin", contents=b'Hello_word\x80\xff')
+        self.assertFalse(simple_test.should_extract_file("strict.bin"))
+        self.assertTrue(simple_test.should_extract_file("split.md"))
+
+    def test_should_extract_file_max_size(self):
+        """Test files larger than the maximum size are not extracted."""
+        simple_test = simple.Simple(**self.default_settings)
+        simple_test.max_file_size = 10
+        self.fs.create_file("small.md", contents="Hello")
+        self.fs.create_file("large.md", contents="Hello_world")
+        self.assertTrue(simple_test.should_extract_file("small.md"))
+        self.assertFalse(simple_test.should_extract_file("large.md"))
+
+    def test_should_extract_file_cached(self):
+        """Test text checks are cached until the file changes."""
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("example.md", contents="Hello_word")
+        with patch.object(
+                simple_test, "_check_text", return_value=True) as check:
+            self.assertTrue(simple_test.should_extract_file("example.md"))
+            self.assertTrue(simple_test.should_extract_file("example.md"))
+            self.assertEqual(1, check.call_count)
+            with open("example.md", "w") as file:
+                file.write("Hello_world")
+            self.assertTrue(simple_test.should_extract_file("example.md"))
+            self.assertEqual(2, check.call_count)
+
     @patch("os.stat")
     def test_ignore_hidden(self, os_stat):
         """Test should_extract_file for correctness."""
@@ -97,6 +142,20 @@ class TestSimple(TestCase):
         self.assertNotIn("directory/test.md", files)
         self.assertIn("directory/foo.md", files)
 
+    def test_ignored_paths_directory(self):
+        """Test ignored directories and symlinks into them."""
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("site/index.md")
+        self.fs.create_file("site-other/index.md")
+        self.fs.create_symlink("docs/link.md", "/site/index.md")
+        simple_test.ignore_paths = [os.path.abspath("site")]
+
+        files = simple_test.get_files()
+        self.assertNotIn("site/index.md", files)
+        self.assertNotIn("docs/link.md", files)
+        self.assertIn("site-other/index.md", files)
+        self.assertEqual(1, len(files), msg=f"Files: {files}")
+
     def test_ignored_config(self):
         """Test ignored files from config."""
         self.default_settings["ignore"] = ["test/*"]
@@ -138,6 +197,62 @@ class TestSimple(TestCase):
         self.assertNotIn("directory/test.md", files)
         self.assertIn("hello.md", files)
 
+    def test_ignored_mkdocsignore_scoped(self):
+        """Test mkdocsignore rules only apply to their own directory."""
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file(".mkdocsignore", contents="*draft*")
+        self.fs.create_file("foo/docs/.mkdocsignore", contents="bar.md")
+        self.fs.create_file("foo/docs/bar.md")
+        self.fs.create_file("foo/docs/draft.md")
+        self.fs.create_file("foo/docs/index.md")
+        self.fs.create_file("foo/bar.md")
+        self.fs.create_file("venv/.mkdocsignore", contents="*")
+        simple_test.ignore_glob = set(["venv"])
+        simple_test.folders = set(["**/docs"])
+
+        files = simple_test.get_files()
+        self.assertIn("foo/docs/index.md", files)
+        self.assertIn("foo/docs/.mkdocsignore", files)
+        self.assertEqual(2, len(files), msg=f"Files: {files}")
+        # .mkdocsignore files are only loaded for directories that are walked
+        self.assertIn(".", simple_test.ignore_patterns)
+        self.assertIn("foo/docs", simple_test.ignore_patterns)
+        self.assertNotIn("venv", simple_test.ignore_patterns)
+
+    def test_is_watched(self):
+        """Test changes to ignored paths or outside the root aren't watched."""
+        self.default_settings["ignore"] = ["test/*"]
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("/project/directory/test.md")
+        self.fs.create_file("/project/test/file.md")
+        self.fs.create_file("/project/site/index.md")
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir("/project")
+        simple_test.ignore_paths = [os.path.abspath("site")]
+        simple_test.get_files()
+
+        self.assertTrue(simple_test.is_watched("directory/test.md"))
+        self.assertTrue(
+            simple_test.is_watched(os.path.abspath("directory/new.md")))
+        self.assertFalse(simple_test.is_watched("test/file.md"))
+        self.assertFalse(simple_test.is_watched("site/index.md"))
+        self.assertFalse(simple_test.is_watched("../outside.md"))
+
+    def test_is_watched_mkdocsignore(self):
+        """Test .mkdocsignore files are watched if they ignore themselves."""
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("empty/.mkdocsignore")
+        self.fs.create_file("empty/file.md")
+        self.fs.create_file("star/.mkdocsignore", contents="*\n")
+        self.fs.create_file("hidden/.mkdocsignore", contents=".*\n")
+        simple_test.get_files()
+
+        for directory in ["empty", "star", "hidden"]:
+            with self.subTest(directory=directory):
+                self.assertTrue(simple_test.is_watched(
+                    os.path.join(directory, ".mkdocsignore")))
+        self.assertFalse(simple_test.is_watched("empty/file.md"))
+
     def test_is_doc_file(self):
         """Test if doc file."""
         simple_test = simple.Simple(**self.default_settings)
@@ -281,6 +396,57 @@ class TestSimple(TestCase):
         self.assertIn(".mkdocsignore", files)
         self.assertEqual(4, len(files), msg=f"Files: {files}")
 
+    def test_get_files_prunes_ignored_folders(self):
+        """Test ignored folders are not scanned."""
+        self.default_settings["ignore"] = ["venv"]
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("venv/lib/module.py")
+        self.fs.create_file("src/module.py")
+        scanned = []
+        scandir = os.scandir
+
+        def scandir_spy(path="."):
+            scanned.append(os.path.normpath(path))
+            return scandir(path)
+
+        with patch("mkdocs_simple_plugin.simple.os.scandir", scandir_spy):
+            files = simple_test.get_files()
+        self.assertEqual(["src/module.py"], files)
+        self.assertIn("src", scanned)
+        self.assertNotIn("venv", scanned)
+        self.assertNotIn("venv/lib", scanned)
+
+    def test_get_files_directories(self):
+        """Test the directories kept and pruned by the walker are recorded."""
+        self.default_settings["ignore"] = ["tmp", "venv", "*/node_modules"]
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("README.md")
+        self.fs.create_file("venv/lib/module.py")
+        self.fs.create_file("src/lib/module.py")
+        self.fs.create_file("src/node_modules/module.js")
+        self.fs.create_dir("src/empty")
+
+        simple_test.get_files()
+        self.assertEqual(
+            set([".", "src", "src/lib", "src/empty"]),
+            simple_test.kept_directories)
+        self.assertEqual(
+            set(["tmp", "venv", "src/node_modules"]),
+            simple_test.pruned_directories)
+
+    def test_get_files_symlinks(self):
+        """Test symlinked files are found, but symlinked folders not walked."""
+        simple_test = simple.Simple(**self.default_settings)
+        self.fs.create_file("/real/page.md")
+        self.fs.create_symlink("/foo/link", "/real")
+        self.fs.create_symlink("/foo/page.md", "/real/page.md")
+
+        files = simple_test.get_files()
+        self.assertIn("real/page.md", files)
+        self.assertIn("foo/page.md", files)
+        self.assertNotIn("foo/link/page.md", files)
+        self.assertEqual(2, len(files), msg=f"Files: {files}")
+
     def test_build_docs(self):
         """Test build docs."""
         simple_test = simple.Simple(**self.default_settings)
@@ -341,7 +507,7 @@ class TestSimple(TestCase):
         # Run build and make sure the file shows up in paths
         input_paths = []
         output_paths = []
-        built_paths = simple_test.build_docs(dirty=True, last_build_time=0)
+        built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             input_paths.append(os.path.normpath(path.input_path))
             output_paths.append(
@@ -352,12 +518,11 @@ class TestSimple(TestCase):
         self.assertIn("foo/bar.md", input_paths)
         self.assertIn("foo/bar.md", output_paths)
 
-        # Run again, but this time set the last build time
-        dest_time = os.path.getmtime(test_filename)
+        # Run again without changes
         input_paths = []
         output_paths = []
-        built_paths = simple_test.build_docs(dirty=True,
-                                             last_build_time=dest_time)
+        with patch.object(simple_test, "build_file") as build_file:
+            built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             input_paths.append(os.path.normpath(path.input_path))
             output_paths.append(
@@ -365,9 +530,10 @@ class TestSimple(TestCase):
                     os.path.join(
                         path.output_root,
                         path.output_relpath)))
-        # Check that no files were updated
-        self.assertEqual([], input_paths)
-        self.assertEqual([], output_paths)
+        # Check that no files were updated, but the file is still added
+        build_file.assert_not_called()
+        self.assertEqual(["foo/bar.md"], input_paths)
+        self.assertEqual(["foo/bar.md"], output_paths)
 
         # Update the file
         with open(test_filename, 'w') as file:
@@ -375,8 +541,7 @@ class TestSimple(TestCase):
         # Check that the file was built
         input_paths = []
         output_paths = []
-        built_paths = simple_test.build_docs(dirty=True,
-                                             last_build_time=dest_time)
+        built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             input_paths.append(os.path.normpath(path.input_path))
             output_paths.append(
@@ -408,7 +573,7 @@ class TestSimple(TestCase):
         src_time = os.path.getmtime(test_filename)
 
         paths = []
-        built_paths = simple_test.build_docs(dirty=True, last_build_time=0)
+        built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             paths.append(os.path.normpath(path.input_path))
 
@@ -423,14 +588,15 @@ class TestSimple(TestCase):
         with open(built_filename, 'r') as file:
             self.assertEqual(file.read(), "Hello, world!\n")
 
-        # Run again, but this time set the last build time
+        # Run again in a new instance without changes
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
         paths = []
-        built_paths = simple_test.build_docs(dirty=True,
-                                             last_build_time=dest_time)
+        built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             paths.append(os.path.normpath(path.input_path))
-        # Check that the file was not built
-        self.assertNotIn(test_filename, paths)
+        # Check that the file was not built, but is still added
+        self.assertIn(test_filename, paths)
         # Check that the file still exists in the output
         self.assertTrue(os.path.exists(built_filename))
         # Get the modification time
@@ -445,8 +611,7 @@ class TestSimple(TestCase):
             file.write('Modified!')
 
         paths = []
-        built_paths = simple_test.build_docs(dirty=True,
-                                             last_build_time=dirty_time)
+        built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             paths.append(os.path.normpath(path.input_path))
         # Check that path was built
@@ -465,8 +630,7 @@ class TestSimple(TestCase):
         with open(test_filename, 'w') as file:
             file.write('Second time!')
         paths = []
-        built_paths = simple_test.build_docs(dirty=True,
-                                             last_build_time=modified_time)
+        built_paths = simple_test.build_docs(dirty=True)
         for path in built_paths:
             paths.append(os.path.normpath(path.input_path))
         # Check that path was built
@@ -480,6 +644,384 @@ class TestSimple(TestCase):
         with open(built_filename, 'r') as file:
             self.assertEqual(file.read(), "Second time!\n")
 
+    def test_build_docs_dirty_manifest(self):
+        """Test dirty builds only skip sources recorded in the manifest."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+        self.fs.create_file("foo/baz.txt")
+
+        # A clean build records all sources, with or without outputs
+        simple_test.build_docs()
+        with patch.object(simple_test, "build_file") as build_file:
+            paths = simple_test.build_docs(dirty=True)
+        build_file.assert_not_called()
+        self.assertEqual(
+            [("foo/bar.txt", "/build_dir/", "foo/bar.md")],
+            [(path.input_path, path.output_root, path.output_relpath)
+             for path in paths])
+
+        # Missing outputs are rebuilt
+        os.remove("/build_dir/foo/bar.md")
+        paths = simple_test.build_docs(dirty=True)
+        self.assertEqual(["foo/bar.txt"], [p.input_path for p in paths])
+        self.assertTrue(os.path.exists("/build_dir/foo/bar.md"))
+
+        # A change in settings invalidates the manifest
+        simple_test.doc_glob = set(["*.txt"])
+        paths = simple_test.build_docs(dirty=True)
+        self.assertEqual(
+            ["foo/bar.txt", "foo/baz.txt"],
+            sorted(path.input_path for path in paths))
+        self.assertEqual(
+            {"."}, set(path.output_root for path in paths))
+
+    def test_build_docs_without_persisted_manifest(self):
+        """Test a manifest that isn't persisted is only used in process."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        settings["persist_manifest"] = False
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+
+        simple_test.build_docs()
+        self.assertFalse(os.path.exists(simple_test.manifest.path))
+        with patch.object(simple_test, "build_file") as build_file:
+            simple_test.build_docs(dirty=True)
+        build_file.assert_not_called()
+
+    def test_remove_stale_outputs(self):
+        """Test outputs of removed sources are removed from the build dir."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+        self.fs.create_file("foo/baz/qux.txt", contents="Hello, world!")
+        simple_test.build_docs(do_copy=True)
+        self.assertEqual([], simple_test.remove_stale_outputs())
+
+        os.remove("foo/baz/qux.txt")
+        simple_test.build_docs(dirty=True, do_copy=True)
+        self.assertEqual(
+            ["/build_dir/foo/baz/qux.md"], simple_test.remove_stale_outputs())
+        self.assertTrue(os.path.exists("/build_dir/foo/bar.md"))
+        self.assertFalse(os.path.exists("/build_dir/foo/baz"))
+
+    def test_build_docs_warm(self):
+        """Test a second build with the same instance reuses its outputs."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        settings["ignore"] = ["ignored"]
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+        self.fs.create_file("foo/baz.txt", contents="Hello, world!")
+        simple_test.build_docs()
+        matcher = simple_test.ignore_matcher
+
+        with open("foo/bar.txt", "a") as file:
+            file.write("More\n")
+        with patch.object(simple_test, "build_file",
+                          wraps=simple_test.build_file) as build_file:
+            paths = simple_test.build_docs()
+        build_file.assert_called_once_with("foo/bar.txt", False)
+        self.assertEqual(
+            ["foo/bar.txt", "foo/baz.txt"],
+            sorted(path.input_path for path in paths))
+        # The ignore globs are only compiled once
+        self.assertIs(matcher, simple_test.ignore_matcher)
+        self.assertEqual(
+            set(["ignored", "ignored/**"]), simple_test.ignore_glob)
+
+    def test_remove_stale_outputs_links(self):
+        """Test outputs of removed sources are removed for each link mode."""
+        for link_mode in simple.LINK_MODES:
+            with self.subTest(link_mode=link_mode):
+                build_dir = f"/build_{link_mode}"
+                settings = dict(self.default_settings)
+                settings["build_dir"] = build_dir
+                simple_test = simple.Simple(**settings, link_mode=link_mode)
+                simple_test.folders = set([f"src_{link_mode}/"])
+                self.fs.create_file(f"src_{link_mode}/a.md", contents="A")
+                self.fs.create_file(f"src_{link_mode}/b.md", contents="B")
+                simple_test.build_docs(do_copy=True)
+                output = os.path.join(build_dir, f"src_{link_mode}", "b.md")
+                self.assertTrue(os.path.exists(output))
+
+                os.remove(f"src_{link_mode}/b.md")
+                simple_test.build_docs(dirty=True, do_copy=True)
+                self.assertEqual(
+                    [output], simple_test.remove_stale_outputs())
+                self.assertFalse(os.path.lexists(output))
+                self.assertTrue(os.path.exists(
+                    os.path.join(build_dir, f"src_{link_mode}", "a.md")))
+
+    def test_build_changed(self):
+        """Test only changed sources are built again."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+        self.fs.create_file("foo/baz.txt", contents="Hello, world!")
+        self.fs.create_file("foo/qux.txt", contents="Hello, world!")
+        paths = simple_test.build_docs(do_copy=True)
+        previous = simple_test.manifest
+
+        with open("foo/bar.txt", "a") as file:
+            file.write("More\n")
+        os.remove("foo/qux.txt")
+        with patch.object(simple_test, "get_files") as get_files, \
+                patch.object(simple_test, "build_file",
+                             wraps=simple_test.build_file) as build_file:
+            paths = simple_test.build_changed(
+                previous, paths, ["foo/bar.txt", "foo/qux.txt",
+                                  "foo/other.tmp"], do_copy=True)
+        get_files.assert_not_called()
+        build_file.assert_called_once_with("foo/bar.txt", True)
+        self.assertEqual(
+            ["foo/bar.txt", "foo/baz.txt"],
+            sorted(path.input_path for path in paths))
+        with open("/build_dir/foo/bar.md", "r") as file:
+            self.assertEqual("Hello, world!More\n", file.read())
+        self.assertEqual(
+            ["/build_dir/foo/qux.md"], simple_test.remove_stale_outputs())
+
+        # New sources and ignore rules need a full build
+        previous = simple_test.manifest
+        self.fs.create_file("foo/new.txt")
+        self.fs.create_file("foo/.mkdocsignore")
+        for changed in [["foo/new.txt"], ["foo/.mkdocsignore"]]:
+            self.assertIsNone(simple_test.build_changed(
+                previous, paths, changed, do_copy=True))
+        # So do changes to the settings
+        self.assertIsNone(simple_test.build_changed(previous, paths, []))
+        # And missing outputs of unchanged sources
+        os.remove("/build_dir/foo/baz.md")
+        self.assertIsNone(simple_test.build_changed(
+            previous, paths, ["foo/bar.txt"], do_copy=True))
+
+    def test_build_docs_cache(self):
+        """Test extracted files are restored from the cache."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        settings["cache_dir"] = "/cache"
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+
+        simple_test.build_docs()
+        os.remove("/build_dir/foo/bar.md")
+
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        with patch.object(
+                simple_test.semiliterate[0], "try_extraction") as extraction:
+            paths = simple_test.build_docs()
+        extraction.assert_not_called()
+        self.assertEqual(["foo/bar.txt"], [p.input_path for p in paths])
+        with open("/build_dir/foo/bar.md", 'r') as file:
+            self.assertEqual(file.read(), "Hello, world!\n")
+
+    def test_build_docs_cache_io_error(self):
+        """Test a failure to write an output isn't cached."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        settings["cache_dir"] = "/cache"
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        self.fs.create_file("foo/bar.txt", contents="Hello, world!")
+
+        with patch("mkdocs_simple_plugin.semiliterate._write_if_changed",
+                   side_effect=OSError("disk full")):
+            self.assertEqual([], simple_test.build_docs())
+
+        simple_test = simple.Simple(**settings)
+        simple_test.folders = set(["foo/"])
+        paths = simple_test.build_docs()
+        self.assertEqual(["foo/bar.txt"], [p.input_path for p in paths])
+        with open("/build_dir/foo/bar.md", 'r') as file:
+            self.assertEqual(file.read(), "Hello, world!\n")
+
+    def test_try_extract_reads_once(self):
+        """Test the file content is read once and shared by extractions."""
+        settings = self.default_settings
+        settings["semiliterate"] = [
+            {'pattern': r'.*', 'extract': {'start': 'not-found'}},
+            {'pattern': r'.*'},
+        ]
+        simple_test = simple.Simple(**settings)
+        self.fs.create_file("foo/bar.txt", contents=b"Hello\r\nworld\r\n")
+
+        with patch("mkdocs_simple_plugin.semiliterate.open",
+                   create=True, side_effect=open) as semiliterate_open, \
+                patch.object(simple_test, "read_text_file",
+                             wraps=simple_test.read_text_file) as read:
+            paths = simple_test.try_extract("foo", "bar.txt", "/build_dir/foo")
+        # Only the output file is opened, to be written
+        for call in semiliterate_open.call_args_list:
+            self.assertTrue(call.args[0].startswith("/build_dir/foo/bar.md"))
+        read.assert_called_once_with("foo/bar.txt")
+        self.assertEqual(["/build_dir/foo/bar.md"], paths)
+        with open("/build_dir/foo/bar.md", 'r', newline='') as file:
+            self.assertEqual(file.read(), "Hello\nworld\n")
+
+    def test_try_extract_invalid_text(self):
+        """Test files that aren't valid UTF-8 after the sample are skipped."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        simple_test = simple.Simple(**settings)
+        simple_test.text_sample_size = 8
+        self.fs.create_file("foo/bar.txt", contents=b"Hello_world\x80\xff")
+
+        paths = simple_test.try_extract("foo", "bar.txt", "/build_dir/foo")
+        self.assertEqual([], paths)
+        self.assertFalse(os.path.exists("/build_dir/foo/bar.md"))
+
+    def test_try_extract_skip_without_start(self):
+        """Test files without a possible start marker are skipped."""
+        settings = self.default_settings
+        settings["semiliterate"] = [
+            {'pattern': r'.*', 'extract': {'start': r'^#\s?md\b'}}]
+        simple_test = simple.Simple(**settings)
+        self.fs.create_file("foo/bar.txt", contents="Hello\n")
+        self.fs.create_file("foo/baz.txt", contents="Hello\n# md\nWorld\n")
+
+        with patch.object(simple.Semiliterate, "try_extraction",
+                          autospec=True,
+                          side_effect=simple.Semiliterate.try_extraction) \
+                as try_extraction:
+            self.assertEqual(
+                [], simple_test.try_extract("foo", "bar.txt", "/build_dir/foo"))
+            try_extraction.assert_not_called()
+            self.assertEqual(
+                ["/build_dir/foo/baz.md"],
+                simple_test.try_extract("foo", "baz.txt", "/build_dir/foo"))
+        self.assertEqual(1, simple_test.skipped_files)
+
+    def test_try_extract_large_file(self):
+        """Test large files are extracted from a memory map."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'.*'}]
+        simple_test = simple.Simple(**settings, mmap_threshold=10)
+        self.fs.create_file("foo/small.txt", contents="Hello\n")
+        self.fs.create_file("foo/large.txt", contents="Hello world\n")
+
+        with patch.object(simple.Semiliterate, "try_extraction",
+                          return_value=[]) as try_extraction, \
+                patch.object(simple_test, "read_text_file",
+                             wraps=simple_test.read_text_file) as read:
+            simple_test.try_extract("foo", "small.txt", "/build_dir/foo")
+            simple_test.try_extract("foo", "large.txt", "/build_dir/foo")
+        read.assert_called_once_with("foo/small.txt")
+        self.assertEqual(
+            ["stream", "mmap"],
+            [call.kwargs["engine"] for call in try_extraction.call_args_list])
+
+    def test_build_docs_copy_in_background(self):
+        """Test files are copied in the background in the order of a build."""
+        settings = self.default_settings
+        settings["semiliterate"] = [{'pattern': r'\.py$'}]
+        self.fs.create_file("docs/a.md", contents="Copied\n")
+        self.fs.create_file("docs/a.py", contents="Extracted\n")
+        self.fs.create_file("docs/image.md", contents="Image\n")
+
+        expected = {}
+        for copy_threads in [0, 2]:
+            simple_test = simple.Simple(**settings, copy_threads=copy_threads)
+            built_paths = simple_test.build_docs(do_copy=True)
+            self.assertIsNone(simple_test.copy_pool)
+            outputs = {}
+            for name in ["a.md", "image.md"]:
+                with open(os.path.join("/build_dir/docs", name)) as file:
+                    outputs[name] = file.read()
+            expected.setdefault("outputs", outputs)
+            expected.setdefault("paths", built_paths)
+            self.assertEqual(expected["outputs"], outputs)
+            self.assertEqual(expected["paths"], built_paths)
+            shutil.rmtree("/build_dir")
+
+    def test_build_docs_copy_errors(self):
+        """Test errors copying files are reported at the end of the build."""
+        self.fs.create_file("docs/a.md")
+        self.fs.create_file("docs/b.md")
+        simple_test = simple.Simple(**self.default_settings)
+        with patch("mkdocs_simple_plugin.simple.copy",
+                   side_effect=OSError("disk full")), \
+                patch.object(simple.utils.log, "error") as log_error:
+            built_paths = simple_test.build_docs(do_copy=True)
+        self.assertEqual(2, len(built_paths))
+        self.assertEqual(2, log_error.call_count)
+
+    def test_copy_pool(self):
+        """Test the copy pool copies files and collects errors."""
+        self.fs.create_file("src/a.txt", contents="a")
+        os.mkdir("dst")
+        pool = simple.CopyPool(threads=2, max_pending=1)
+        pool.copy("src/a.txt", "dst/a.txt")
+        pool.copy("src/missing.txt", "dst/missing.txt")
+        self.assertTrue(pool.wait(["dst/./a.txt", "dst/other.txt"]))
+        self.assertFalse(pool.wait(["dst/other.txt"]))
+        errors = pool.close()
+        with open("dst/a.txt") as file:
+            self.assertEqual("a", file.read())
+        self.assertEqual(["src/missing.txt"], [source for source, _ in errors])
+
+    def test_link_file(self):
+        """Test files are linked with each mode."""
+        self.fs.create_file("src/a.png", contents="image")
+        os.mkdir("dst")
+        self.assertEqual(
+            "symlink", simple.link_file("src/a.png", "dst/a.png", "symlink"))
+        self.assertEqual(os.path.abspath("src/a.png"), os.readlink("dst/a.png"))
+
+        self.assertEqual(
+            "hardlink", simple.link_file("src/a.png", "dst/a.png", "hardlink"))
+        self.assertFalse(os.path.islink("dst/a.png"))
+        self.assertTrue(os.path.samefile("src/a.png", "dst/a.png"))
+
+        # Copying over a link doesn't write to the source
+        self.assertEqual(
+            "copy", simple.link_file("src/a.png", "dst/a.png", "copy"))
+        self.assertFalse(os.path.samefile("src/a.png", "dst/a.png"))
+        with open("src/a.png") as file:
+            self.assertEqual("image", file.read())
+
+    def test_link_file_fallback(self):
+        """Test the next cheapest mode is used if a mode fails."""
+        self.fs.create_file("src/a.png", contents="image")
+        os.mkdir("dst")
+
+        def fail(source, destination):
+            raise OSError(errno.EXDEV, "Cross-device link", source)
+
+        with patch.dict(simple.LINK_MODES,
+                        {"symlink": fail, "hardlink": fail, "reflink": fail}):
+            self.assertEqual(
+                "copy", simple.link_file("src/a.png", "dst/a.png", "symlink"))
+        with patch.dict(simple.LINK_MODES, {"symlink": fail}):
+            self.assertEqual(
+                "hardlink",
+                simple.link_file("src/a.png", "dst/b.png", "symlink"))
+        self.assertEqual(["a.png", "b.png"], sorted(os.listdir("dst")))
+
+    def test_merge_docs_link(self):
+        """Test merged files are linked, and skipped if unchanged."""
+        self.fs.create_file("/test/file.txt", contents="Hello")
+        settings = self.default_settings
+        simple_test = simple.Simple(**settings, link_mode="hardlink")
+        simple_test.merge_docs("/test")
+        self.assertTrue(
+            os.path.samefile("/test/file.txt", "/build_dir/file.txt"))
+
+        with patch.object(simple, "link_file") as link_file:
+            simple_test.merge_docs("/test", dirty=True)
+        link_file.assert_not_called()
+
     def test_merge_docs_copy(self):
         """Test copy_directory"""
         self.fs.create_file('/test/file.txt')
@@ -547,5 +1089,200 @@ class TestSimple(TestCase):
         self.assertEqual(no_update_dest_time, dirty_dest_time)
 
 
+class TestSimpleWorkers(unittest.TestCase):
+    """Test building files in worker processes."""
+
+    def setUp(self) -> None:
+        """Set up a workspace in a temporary directory.
+
+        Worker processes can't see a fake file system.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+        # Keep the build manifests out of the user's cache directory
+        environ = patch.dict(os.environ, {
+            "XDG_CACHE_HOME": os.path.join(directory.name, "state"),
+            "LOCALAPPDATA": os.path.join(directory.name, "state")})
+        environ.start()
+        self.addCleanup(environ.stop)
+        files = {
+            "README.md": "# Hello\n",
+            "a/module.py": "# md\n# Module\n# /md\n",
+            "a/module.c": "// md\n// From c\n// end md\n",
+            "a/module.h": "// md\n// From h\n// end md\n",
+            "a/b/other.py": "code\n",
+            "c/doc.md": "Doc\n",
+            "c/lib.js": "/** md\nLib\n**/\n",
+        }
+        for path, content in files.items():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content)
+        self.settings = {
+            "folders": ["*"],
+            "ignore": ["build_*"],
+            "include": ["*.md"],
+            "ignore_hidden": True,
+            "ignore_paths": [],
+            "semiliterate": [{
+                "pattern": r".*",
+                "extract": [
+                    {"start": r"^#\s?md", "stop": r"^#\s?/md",
+                     "replace": [r"^# (.*\n?)$"]},
+                    {"start": r"^//\s?md", "stop": r"^//\send md",
+                     "replace": [r"^// (.*\n?)$"]},
+                    {"start": r"^/\*\*\s?md", "stop": r"^\*\*/"},
+                ],
+            }],
+        }
+
+    def build(self, build_dir: str, workers: int) -> tuple:
+        """Build the workspace and read the outputs."""
+        simple_test = simple.Simple(
+            build_dir=build_dir, workers=workers, **self.settings)
+        paths = [(path.output_relpath, path.input_path)
+                 for path in simple_test.build_docs(do_copy=True)]
+        outputs = {}
+        for root, _, files in os.walk(build_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as file:
+                    outputs[os.path.relpath(path, build_dir)] = file.read()
+        return paths, outputs
+
+    def test_same_as_serial(self):
+        """Test the paths and outputs are the same as a serial build."""
+        paths, outputs = self.build("build_serial", 1)
+        self.assertIn("a/module.md", outputs)
+        self.assertEqual((paths, outputs), self.build("build_workers", 3))
+
+
+class TestPathPrefixIndex(unittest.TestCase):
+    """Test PathPrefixIndex."""
+
+    def test_contains(self):
+        """Test paths inside indexed paths are found."""
+        index = simple.PathPrefixIndex(
+            ["/a", "/a/b", "/c/d/", "/c/file.md", "/e/f/../g"])
+        self.assertEqual(["/a/", "/c/d/", "/c/file.md/", "/e/g/"],
+                         index.prefixes)
+        self.assertTrue(index.contains("/a"))
+        self.assertTrue(index.contains("/a/b/c.md"))
+        self.assertTrue(index.contains("/a/c"))
+        self.assertTrue(index.contains("/c/d"))
+        self.assertTrue(index.contains("/c/file.md"))
+        self.assertTrue(index.contains("/e/g/h.md"))
+        self.assertFalse(index.contains("/"))
+        self.assertFalse(index.contains("/a-b/c.md"))
+        self.assertFalse(index.contains("/ab"))
+        self.assertFalse(index.contains("/c"))
+        self.assertFalse(index.contains("/c/d.md"))
+        self.assertFalse(index.contains("/c/file.md.bak"))
+        self.assertFalse(index.contains("/e/f/g"))
+
+    def test_empty(self):
+        """Test an empty index contains nothing."""
+        index = simple.PathPrefixIndex([])
+        self.assertFalse(index.contains("/"))
+        self.assertFalse(index.contains("/a"))
+
+
+class TestIgnoreMatcher(unittest.TestCase):
+    """Test IgnoreMatcher agrees with fnmatch."""
+
+    patterns = [
+        "*.egg-info",
+        "**/__pycache__/**",
+        "vendor/**",
+        "venv/**",
+        ".**/**",
+        "foo/bar",
+        "foo/bar/**",
+        "test/*",
+        "*foo*",
+        "directory/*bar*",
+        "goo/night.md",
+        "docs/?.md",
+        "[abc]*.txt",
+        "[!a]b.md",
+        "build (1)/*.md",
+        "c++/**",
+        "a/**/b",
+        "*",
+        "",
+    ]
+
+    paths = [
+        "",
+        "foo",
+        "foo/bar",
+        "foo/bar/baz.md",
+        "foo/barbaz",
+        "food/bar",
+        "mkdocs_simple_plugin.egg-info",
+        "src/mkdocs.egg-info/PKG-INFO",
+        "__pycache__",
+        "src/__pycache__/simple.cpython-311.pyc",
+        "vendor",
+        "vendor/lib/module.py",
+        "venv/bin/python",
+        "src/venv/bin/python",
+        ".git",
+        ".git/HEAD",
+        ".github/workflows/test.yml",
+        "src/.hidden/file.md",
+        "test/file.md",
+        "test/sub/file.md",
+        "directory/foo.md",
+        "directory/bar.md",
+        "directory/world.md",
+        "goo/night.md",
+        "goo/day.md",
+        "docs/a.md",
+        "docs/ab.md",
+        "a.txt",
+        "d.txt",
+        "bb.md",
+        "ab.md",
+        "build (1)/index.md",
+        "build 1/index.md",
+        "c++/main.cpp",
+        "c/main.cpp",
+        "a/b",
+        "a/x/y/b",
+        "a/b/c",
+        "line\nbreak.md",
+    ]
+
+    def test_single_patterns(self):
+        """Test each pattern on its own gives the same verdict as fnmatch."""
+        for pattern in self.patterns:
+            matcher = simple.IgnoreMatcher([pattern])
+            for path in self.paths:
+                with self.subTest(pattern=pattern, path=path):
+                    self.assertEqual(
+                        fnmatch.fnmatch(path, pattern), matcher.match(path))
+
+    def test_combined_patterns(self):
+        """Test combinations of patterns give the same verdict as fnmatch."""
+        for count in range(1, len(self.patterns) + 1):
+            patterns = self.patterns[:count]
+            matcher = simple.IgnoreMatcher(patterns)
+            for path in self.paths:
+                with self.subTest(patterns=patterns, path=path):
+                    self.assertEqual(
+                        any(fnmatch.fnmatch(path, pattern)
+                            for pattern in patterns),
+                        matcher.match(path))
+
+    def test_empty(self):
+        """Test an empty set of patterns matches nothing."""
+        matcher = simple.IgnoreMatcher([])
+        self.assertFalse(matcher.match(""))
+        self.assertFalse(matcher.match("foo/bar.md"))
+
+
 if __name__ == '__main__':
     unittest.main()